@@ -1,3 +1,4 @@
 from .http_parse import HttpRequest
-from .http_write import send_http_response
-from .server import ThreadedHTTPServer
\ No newline at end of file
+from .http_write import send_http_response, send_http_file_response
+from .server import ThreadedHTTPServer
+from .server_asyncio import AsyncHTTPServer, send_http_response_async
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing import Optional, Union
+import asyncio
 import socket
 import ssl
 import traceback
@@ -10,6 +11,7 @@ class HttpRequest:
     Attributes:
         method (str): HTTP method (e.g., GET, POST).
         path (str): Request path.
+        path_bytes (bytes): Request path, as the raw bytes in the request line.
         version (str): HTTP version (should be 'HTTP/1.1').
         headers (Dict[str, str]): Dictionary of HTTP headers.
         body (bytes): Request body.
@@ -17,6 +19,7 @@ class HttpRequest:
     """
     method: Optional[str]
     path: Optional[str]
+    path_bytes: Optional[bytes]
     version: Optional[str]
     headers: Optional[dict[str, str]] # header keys are translated to lowercase
     body: Optional[bytes]
@@ -25,6 +28,7 @@ class HttpRequest:
     def __init__(self):
         self.method = None
         self.path = None
+        self.path_bytes = None
         self.version = None
         self.headers = None
         self.body = None
@@ -50,6 +54,12 @@ class HttpRequest:
             return None
         return self.path
 
+    def get_path_bytes(self) -> Optional[bytes]:
+        """Get the request path as raw bytes."""
+        if self.has_error():
+            return None
+        return self.path_bytes
+
     def get_version(self) -> Optional[str]:
         """Get the HTTP version."""
         if self.has_error():
@@ -84,9 +94,89 @@ class HttpRequest:
             return False
         return connection.lower() == "close"
 
+HEADER_TERMINATOR = b'\r\n\r\n'
+METHODS_WITH_BODY = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+
+def _parse_request_head(header_bytes: Union[bytes, bytearray],
+                        request: HttpRequest,
+                        max_content_length: int) -> Optional[int]:
+    """
+    Parse the request line and headers (terminated by CRLF CRLF) into the given request.
+
+    Args:
+        header_bytes (Union[bytes, bytearray]): The request head, including the terminating CRLF CRLF.
+        request (HttpRequest): The request to populate.
+        max_content_length (int): The maximum allowed length of the request body, in bytes (Content-Length header).
+
+    Returns:
+        Optional[int]: The length of the body to be read, or None if parsing failed (the error is set on the request).
+    """
+    # Decode headers
+    try:
+        header_text = header_bytes.decode('iso-8859-1')
+    except UnicodeDecodeError:
+        request._error = "Failed to decode HTTP headers."
+        return None
+
+    # Split request into lines
+    lines = header_text.split("\r\n")
+    if len(lines) < 1:
+        request._error = "Empty HTTP request."
+        return None
+
+    # Parse request line
+    request_line = lines[0]
+    parts = request_line.split()
+    if len(parts) != 3:
+        request._error = "Invalid HTTP request line."
+        return None
+    method, path, version = parts
+    request.method = method
+    request.path = path
+    request.path_bytes = path.encode('iso-8859-1') # exact inverse of the decoding above
+    request.version = version
+
+    # Validate HTTP version
+    if version != "HTTP/1.1":
+        request._error = f"Unsupported HTTP version: {version}."
+        return None
+
+    # Parse headers
+    headers = {}
+    for header_line in lines[1:]:
+        if header_line == '':
+            continue  # Skip empty lines (shouldn't be any before HEADER_TERMINATOR)
+        if ':' not in header_line:
+            request._error = f"Invalid header format: '{header_line}'."
+            return None
+        key, value = header_line.split(':', 1)
+        headers[key.strip().lower()] = value.strip()
+    request.headers = headers
+
+    # Determine if there is a body
+    content_length = headers.get('content-length')
+    if content_length is None:
+        # No body; ensure that methods that require a body have Content-Length
+        if request.method.upper() in METHODS_WITH_BODY:
+            request._error = "Missing Content-Length header for request with a body."
+            return None
+        return 0
+    try:
+        body_length = int(content_length)
+        if body_length < 0:
+            raise ValueError
+    except ValueError:
+        request._error = "Invalid Content-Length header."
+        return None
+    if body_length > max_content_length:
+        request._error = "Request body too large."
+        return None
+    return body_length
+
 def parse_http_request(sock: Union[socket.socket, ssl.SSLSocket],
                        max_reads: int,
-                       max_content_length: int) -> Optional[HttpRequest]:
+                       max_content_length: int,
+                       buf: Optional[memoryview] = None) -> Optional[HttpRequest]:
     """
     Parse an HTTP/1.1 request from the given socket, and read whatever content is available.
 
@@ -94,6 +184,8 @@ def parse_http_request(sock: Union[socket.socket, ssl.SSLSocket],
         sock (socket.socket): The TCP or TLS socket to read from.
         max_reads (int): The maximum number of times to read from the socket.
         max_content_length (int): The maximum allowed length of the request body, in bytes (Content-Length header).
+        buf (Optional[memoryview]): If given, a writable memoryview of a whole bytearray, which is reused to receive the request
+                                    without allocating. Requests not fitting in the buffer are read into allocated buffers instead.
 
     Returns:
         Optional[HttpRequest]: An HttpRequest object if a request is successfully parsed,
@@ -101,23 +193,32 @@ def parse_http_request(sock: Union[socket.socket, ssl.SSLSocket],
                             or an HttpRequest object with an error message if parsing failed.
     """
     BUFFER_SIZE = 4096  # Number of bytes to read at once
-    HEADER_TERMINATOR = b'\r\n\r\n'
-    buffer = bytearray()
+    view = buf # the reusable buffer, or None once the request outgrows it
+    data = buf.obj if buf is not None else bytearray() # the received bytes. Only the first n are valid if view isn't None
+    n = 0
     request = HttpRequest()
     reads = 0
     try:
         # Read until we have headers terminated by CRLF CRLF
-        while HEADER_TERMINATOR not in buffer:
+        header_end = -1
+        while header_end < 0:
+            if view is not None and n == len(view): # head larger than the reusable buffer
+                data = bytearray(view[:n])
+                view = None
             try:
-                chunk = sock.recv(BUFFER_SIZE)
-                if not chunk:
+                if view is not None:
+                    received = sock.recv_into(view[n:])
+                else:
+                    chunk = sock.recv(BUFFER_SIZE)
+                    data.extend(chunk)
+                    received = len(chunk)
+                if received == 0:
                     # Connection closed by client
                     if reads == 0:
                         return None
                     else:
                         request._error = "Connection closed by client before completing the request."
                         return request
-                buffer.extend(chunk)
             except socket.timeout:
                 if reads == 0:
                     # Timeout on first read means no data available yet
@@ -126,103 +227,104 @@ def parse_http_request(sock: Union[socket.socket, ssl.SSLSocket],
                     # Timeout during reading headers
                     request._error = "Timeout occurred while reading the HTTP request headers."
                     return request
-            
+
+            # only search the new bytes, and the end of the previous ones in case the terminator is split between reads
+            header_end = data.find(HEADER_TERMINATOR, max(0, n - len(HEADER_TERMINATOR) + 1), n + received)
+            n += received
             reads += 1
-            if (reads >= max_reads) and (HEADER_TERMINATOR not in buffer): # If max reads reached and headers not ended, return error
+            if (reads >= max_reads) and (header_end < 0): # If max reads reached and headers not ended, return error
                 request._error = "Maximum number of reads reached before completing the request."
                 return request
 
         # Split headers and remaining buffer
-        header_end = buffer.index(HEADER_TERMINATOR) + len(HEADER_TERMINATOR)
-        header_bytes = buffer[:header_end]
-        remaining = buffer[header_end:]
-
-        # Decode headers
-        try:
-            header_text = header_bytes.decode('iso-8859-1')
-        except UnicodeDecodeError:
-            request._error = "Failed to decode HTTP headers."
+        header_end += len(HEADER_TERMINATOR)
+        body_length = _parse_request_head(data[:header_end], request, max_content_length)
+        if body_length is None:
             return request
 
-        # Split request into lines
-        lines = header_text.split("\r\n")
-        if len(lines) < 1:
-            request._error = "Empty HTTP request."
-            return request
-
-        # Parse request line
-        request_line = lines[0]
-        parts = request_line.split()
-        if len(parts) != 3:
-            request._error = "Invalid HTTP request line."
-            return request
-        method, path, version = parts
-        request.method = method
-        request.path = path
-        request.version = version
-
-        # Validate HTTP version
-        if version != "HTTP/1.1":
-            request._error = f"Unsupported HTTP version: {version}."
-            return request
-
-        # Parse headers
-        headers = {}
-        for header_line in lines[1:]:
-            if header_line == '':
-                continue  # Skip empty lines (shouldn't be any before HEADER_TERMINATOR)
-            if ':' not in header_line:
-                request._error = f"Invalid header format: '{header_line}'."
-                return request
-            key, value = header_line.split(':', 1)
-            headers[key.strip().lower()] = value.strip()
-        request.headers = headers
-
-        # Determine if there is a body
-        content_length = headers.get('content-length')
-        if content_length is not None:
+        # Read the body from the remaining buffer, and the socket if necessary
+        request_end = header_end + body_length
+        if view is not None and request_end > len(view): # body larger than the reusable buffer
+            data = bytearray(view[:n])
+            view = None
+        while n < request_end:
             try:
-                body_length = int(content_length)
-                if body_length < 0:
-                    raise ValueError
-            except ValueError:
-                request._error = "Invalid Content-Length header."
+                if view is not None:
+                    received = sock.recv_into(view[n:request_end])
+                else:
+                    chunk = sock.recv(min(BUFFER_SIZE, request_end - n))
+                    data.extend(chunk)
+                    received = len(chunk)
+                if received == 0:
+                    request._error = "Connection closed by client while reading the body."
+                    return request
+                n += received
+            except socket.timeout:
+                request._error = "Timeout occurred while reading the HTTP request body."
                 return request
-            if body_length > max_content_length:
-                request._error = "Request body too large."
+            reads += 1
+            if (reads >= max_reads) and (n < request_end): # If max reads reached and body not complete, return error
+                request._error = "Maximum number of reads reached before completing the request body."
                 return request
 
-            # Read the body from the remaining buffer, and the socket if necessary
-            body = remaining
-            bytes_needed = body_length - len(body)
-            while bytes_needed > 0:
-                try:
-                    chunk = sock.recv(min(BUFFER_SIZE, bytes_needed))
-                    if not chunk:
-                        request._error = "Connection closed by client while reading the body."
-                        return request
-                    body.extend(chunk)
-                    bytes_needed -= len(chunk)
-                except socket.timeout:
-                    request._error = "Timeout occurred while reading the HTTP request body."
-                    return request
-                reads += 1
-                if (reads >= max_reads) and (bytes_needed > 0): # If max reads reached and body not complete, return error
-                    request._error = "Maximum number of reads reached before completing the request body."
-                    return request
+        request.body = bytes(data[header_end:request_end])
+        return request
 
-            request.body = bytes(body[:body_length])
-        else:
-            # No body; ensure that methods that require a body have Content-Length
-            methods_with_body = {'POST', 'PUT', 'PATCH', 'DELETE'}
-            if request.method.upper() in methods_with_body:
-                request._error = "Missing Content-Length header for request with a body."
-                return request
-            request.body = b''
+    except Exception as e:
+        # Catch all unexpected exceptions and store traceback
+        request._error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        return request
+
+async def parse_http_request_async(reader: asyncio.StreamReader,
+                                   timeout: float,
+                                   max_content_length: int) -> Optional[HttpRequest]:
+    """
+    Parse an HTTP/1.1 request from the given asyncio stream. The maximum size of the request
+    head is bounded by the limit of the StreamReader.
+
+    Args:
+        reader (asyncio.StreamReader): The TCP or TLS stream to read from.
+        timeout (float): Timeout for reading the request head, and for reading the body.
+        max_content_length (int): The maximum allowed length of the request body, in bytes (Content-Length header).
+
+    Returns:
+        Optional[HttpRequest]: An HttpRequest object if a request is successfully parsed,
+                            None if the connection is closed before any data is sent,
+                            or an HttpRequest object with an error message if parsing failed.
+    """
+    request = HttpRequest()
+    try:
+        # Read until we have headers terminated by CRLF CRLF
+        try:
+            header_bytes = await asyncio.wait_for(reader.readuntil(HEADER_TERMINATOR), timeout)
+        except asyncio.IncompleteReadError as e:
+            if len(e.partial) == 0:
+                return None
+            request._error = "Connection closed by client before completing the request."
+            return request
+        except asyncio.LimitOverrunError:
+            request._error = "Maximum size of the request headers exceeded."
+            return request
+        except asyncio.TimeoutError:
+            request._error = "Timeout occurred while reading the HTTP request headers."
+            return request
+
+        body_length = _parse_request_head(header_bytes, request, max_content_length)
+        if body_length is None:
+            return request
 
+        # Read the body
+        try:
+            request.body = await asyncio.wait_for(reader.readexactly(body_length), timeout)
+        except asyncio.IncompleteReadError:
+            request._error = "Connection closed by client while reading the body."
+            return request
+        except asyncio.TimeoutError:
+            request._error = "Timeout occurred while reading the HTTP request body."
+            return request
         return request
 
     except Exception as e:
         # Catch all unexpected exceptions and store traceback
         request._error = ''.join(traceback.format_exception_only(type(e), e)).strip()
-        return request
\ No newline at end of file
+        return request
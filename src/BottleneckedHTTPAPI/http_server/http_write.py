@@ -1,6 +1,7 @@
+import os
 import socket
 import ssl
-from typing import Union, Optional
+from typing import Union, Optional, BinaryIO
 
 # Mapping of standard HTTP status codes to reason phrases
 STATUS_CODES: dict[int, str] = {
@@ -66,20 +67,10 @@ STATUS_CODES: dict[int, str] = {
     511: "Network Authentication Required",
 }
 
-def send_http_response(
-    sock: Union[socket.socket, ssl.SSLSocket],
-    status_code: int,
-    headers: dict[str, str],
-    body: Optional[Union[str, bytes]] = None
-) -> None:
+def _encode_head(status_code: int, headers_lower: dict[str, str]) -> bytes:
     """
-    Constructs and sends an HTTP/1.1 response over the provided socket.
-
-    Args:
-        sock (Union[socket.socket, ssl.SSLSocket]): The socket to send the response through.
-        status_code (int): The HTTP status code (e.g., 200, 404).
-        headers (dict[str, str]): A dictionary of HTTP headers.
-        body (Optional[bytes]): The response body as bytes. Defaults to None.
+    Constructs the status line and the headers section. The header keys must be lowercase,
+    and should already contain the Content-Length.
     """
     if status_code not in STATUS_CODES:
         raise ValueError(f"Invalid status code: {status_code}")
@@ -88,18 +79,6 @@ def send_http_response(
     reason_phrase = STATUS_CODES[status_code]
     status_line = f"HTTP/1.1 {status_code} {reason_phrase}\r\n"
 
-    # Ensure headers keys are case-insensitive
-    headers_lower = {k.lower(): v for k, v in headers.items()}
-
-    # If a body is present, set the Content-Length header
-    if body is not None:
-        if isinstance(body, str):
-            body = body.encode("utf-8")
-        headers_lower['content-length'] = str(len(body))
-    else:
-        # If no body, Content-Length should be 0 for certain methods
-        headers_lower['content-length'] = '0'
-
     # Ensure the Connection header is set to keep the connection alive by default
     if 'connection' not in headers_lower:
         headers_lower['connection'] = 'keep-alive'
@@ -116,10 +95,113 @@ def send_http_response(
 
     # Combine status line and headers
     response = status_line + headers_section
-    response_bytes = response.encode('iso-8859-1')
+    return response.encode('iso-8859-1')
 
-    sock.sendall(response_bytes)
+def encode_http_response(
+    status_code: int,
+    headers: dict[str, str],
+    body: Optional[Union[str, bytes]] = None
+) -> tuple[bytes, Optional[bytes]]:
+    """
+    Constructs the bytes of an HTTP/1.1 response, without sending it.
+
+    Args:
+        status_code (int): The HTTP status code (e.g., 200, 404).
+        headers (dict[str, str]): A dictionary of HTTP headers.
+        body (Optional[bytes]): The response body as bytes. Defaults to None.
+
+    Returns:
+        tuple[bytes, Optional[bytes]]: The status line and headers, and the encoded body (if any).
+    """
+    # Ensure headers keys are case-insensitive
+    headers_lower = {k.lower(): v for k, v in headers.items()}
+
+    # If a body is present, set the Content-Length header
+    if body is not None:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        headers_lower['content-length'] = str(len(body))
+    else:
+        # If no body, Content-Length should be 0 for certain methods
+        headers_lower['content-length'] = '0'
+
+    return _encode_head(status_code, headers_lower), body
+
+def _sendmsg_all(sock: socket.socket, buffers: list[bytes]) -> None:
+    """
+    Send all the buffers with the minimum number of sendmsg calls, so the kernel gathers
+    them without joining the buffers in userspace.
+    """
+    views = [memoryview(b) for b in buffers if len(b) > 0]
+    while len(views) > 0:
+        sent = sock.sendmsg(views)
+        # drop the fully sent buffers, and slice the partially sent one
+        idx = 0
+        while idx < len(views) and sent >= len(views[idx]):
+            sent -= len(views[idx])
+            idx += 1
+        views = views[idx:]
+        if sent > 0:
+            views[0] = views[0][sent:]
+
+def send_http_response(
+    sock: Union[socket.socket, ssl.SSLSocket],
+    status_code: int,
+    headers: dict[str, str],
+    body: Optional[Union[str, bytes]] = None
+) -> None:
+    """
+    Constructs and sends an HTTP/1.1 response over the provided socket.
+
+    Args:
+        sock (Union[socket.socket, ssl.SSLSocket]): The socket to send the response through.
+        status_code (int): The HTTP status code (e.g., 200, 404).
+        headers (dict[str, str]): A dictionary of HTTP headers.
+        body (Optional[bytes]): The response body as bytes. Defaults to None.
+    """
+    response_bytes, body = encode_http_response(status_code, headers, body)
+
+    if not body:
+        sock.sendall(response_bytes)
+    elif isinstance(sock, socket.socket) and not isinstance(sock, ssl.SSLSocket):
+        # Send the headers and body together, with a vectored write (TLS sockets don't support sendmsg)
+        _sendmsg_all(sock, [response_bytes, body])
+    else:
+        sock.sendall(response_bytes)
+        sock.sendall(body)
+
+def send_http_file_response(
+    sock: Union[socket.socket, ssl.SSLSocket],
+    status_code: int,
+    headers: dict[str, str],
+    fileobj: BinaryIO
+) -> None:
+    """
+    Constructs and sends an HTTP/1.1 response over the provided socket, with the body being the
+    remaining contents of a regular file opened in binary mode. The body is sent with sendfile
+    (zero-copy on Linux for TCP sockets, and falls back to send for TLS sockets).
+
+    Args:
+        sock (Union[socket.socket, ssl.SSLSocket]): The socket to send the response through.
+        status_code (int): The HTTP status code (e.g., 200, 404).
+        headers (dict[str, str]): A dictionary of HTTP headers.
+        fileobj (BinaryIO): The file to send, from its current position to the end.
+    """
+    offset = fileobj.tell()
+    count = max(os.fstat(fileobj.fileno()).st_size - offset, 0)
+
+    headers_lower = {k.lower(): v for k, v in headers.items()}
+    headers_lower['content-length'] = str(count)
+    sock.sendall(_encode_head(status_code, headers_lower))
 
-    # Append body if present
-    if body:
-        sock.sendall(body)
\ No newline at end of file
+    if count > 0:
+        if isinstance(sock, socket.socket):
+            sock.sendfile(fileobj, offset, count)
+        else:
+            # socket-like objects (e.g. of AsyncHTTPServer) only support sendall
+            while count > 0:
+                chunk = fileobj.read(min(count, 65536))
+                if not chunk:
+                    raise EOFError("The file was truncated while sending it.")
+                sock.sendall(chunk)
+                count -= len(chunk)
\ No newline at end of file
@@ -0,0 +1,114 @@
+import re
+import threading
+from typing import Optional
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+def encode_pattern(pattern: str) -> bytes:
+    """
+    Encode a route pattern like the parsed request line. Raises ValueError if the pattern is not a valid regular expression.
+    """
+    try:
+        pattern_bytes = pattern.encode("iso-8859-1") # same encoding as the parsed request line
+        re.compile(pattern_bytes)
+        re.compile(b"(?:" + pattern_bytes + b")") # must also compile when combined with the other patterns (e.g. no global flags)
+    except UnicodeEncodeError:
+        raise ValueError("The pattern must be encodable in ISO-8859-1.")
+    except re.error as e:
+        raise ValueError(f"Invalid route pattern {pattern}: {e}")
+    return pattern_bytes
+
+class PatternRoutes:
+    """
+    Pattern routes compiled into a single matcher, so that the cost of a lookup doesn't grow with the number of patterns.
+    Uses a hyperscan database (DFA) if the hyperscan package is installed, otherwise a single combined regular expression.
+
+    A path matches a pattern only if the whole path matches. If several patterns match, the one added first wins.
+    Without hyperscan, only the patterns without groups are combined: wrapping a pattern with groups in the combined
+    expression would shift its group numbers (breaking backreferences) and could clash with its group names.
+    The patterns with groups are matched one by one, so use non-capturing groups (?:...) where possible.
+    """
+    __slots__ = ("_patterns", "_funcs", "_db", "_db_lock", "_regex", "_grouped")
+
+    def __init__(self) -> None:
+        self._patterns: list[bytes] = []
+        self._funcs: list[callable] = []
+        self._db = None
+        self._db_lock = threading.Lock() # the scratch space of a hyperscan database can only be used by one scan at a time
+        self._regex: Optional[re.Pattern] = None # the patterns without groups
+        self._grouped: list[tuple[int, re.Pattern]] = [] # (index, compiled pattern) of the patterns with groups, in the order added
+
+    def add(self, pattern: bytes, func: callable) -> None:
+        """
+        Add a pattern route.
+
+        :param pattern: The regular expression matched against the request path, as returned by encode_pattern.
+        :param func: The function handling the matching paths.
+        """
+        self._patterns.append(pattern)
+        self._funcs.append(func)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def compile(self) -> None:
+        """
+        Compile the added patterns. Called once before the server starts, the patterns can no longer be changed afterwards.
+        """
+        if not self._patterns:
+            return
+        if hyperscan is not None:
+            db = hyperscan.Database()
+            try:
+                db.compile(
+                    expressions=[b"^(?:" + p + b")$" for p in self._patterns],
+                    ids=list(range(len(self._patterns))),
+                    elements=len(self._patterns),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY] * len(self._patterns)
+                )
+                self._db = db
+            except hyperscan.error: # unsupported constructs (e.g. backreferences, lookarounds), use the regular expression instead
+                self._db = None
+        if self._db is None:
+            combined: list[bytes] = []
+            self._grouped = []
+            for i, p in enumerate(self._patterns):
+                compiled = re.compile(p)
+                if compiled.groups == 0:
+                    combined.append(b"(?P<r%d>%s)" % (i, p)) # named groups r0, r1, ... tell which alternative matched
+                else:
+                    self._grouped.append((i, compiled))
+            self._regex = re.compile(b"|".join(combined)) if combined else None
+
+    def match(self, path: bytes) -> Optional[callable]:
+        """
+        Return the function of the first pattern matching the whole path, or None.
+
+        Args:
+            path (bytes): The raw request path.
+
+        Returns:
+            Optional[callable]: The function, or None if no pattern matches.
+        """
+        if self._db is not None:
+            matched: list[int] = []
+            def on_match(id: int, start: int, end: int, flags: int, context) -> Optional[bool]:
+                matched.append(id)
+            with self._db_lock:
+                self._db.scan(path, match_event_handler=on_match)
+            return self._funcs[min(matched)] if matched else None
+        best: Optional[int] = None
+        if self._regex is not None:
+            m = self._regex.fullmatch(path)
+            if m is not None:
+                best = int(m.lastgroup[1:])
+        for i, compiled in self._grouped: # only the ones added before the combined match can still win
+            if best is not None and i > best:
+                break
+            if compiled.fullmatch(path) is not None:
+                best = i
+                break
+        return self._funcs[best] if best is not None else None
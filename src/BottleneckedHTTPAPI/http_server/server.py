@@ -2,31 +2,149 @@ import socket
 import ssl
 import threading
 import logging
-import traceback
 import os
-from typing import Optional
+import collections.abc
+import queue
+import selectors
+import concurrent.futures
+import multiprocessing
+import multiprocessing.synchronize
+import types
+from typing import Optional, Mapping
 
 from . import http_parse
 from . import http_write
+from . import uring
+from . import routing
+
+def _encode_error_response(status_code: int, body: str) -> bytes:
+    head, body = http_write.encode_http_response(status_code, {"Connection": "close"}, body)
+    return head + body
+
+# Fixed error responses, precomputed so the error branches only need a sendall
+_ERR_400 = _encode_error_response(400, "Bad Request")
+_ERR_404 = _encode_error_response(404, "Not Found")
+_ERR_500 = _encode_error_response(500, "Internal Server Error")
+
+_RECV_BUFFER_SIZE = 64 * 1024 # size of the reusable receive buffer of each worker thread. Larger requests are read into allocated buffers
+_DEFAULT_MAX_WORKERS = 256 # the workers are I/O bound, a connection holds its worker from accept until it is answered or times out. Threads are only started on demand
 
 class _ThreadFlags:
     """Keep track of the state of a client thread."""
     __EXIT_REASON_DEFAULT = "Unset"
-    address: tuple[str, int]
-    exit_reason: str
-    stop_flag: bool
+    __slots__ = ("exit_reason", "address", "stop_flag")
 
     def __init__(self, address: tuple[str, int]) -> None:
         self.exit_reason = _ThreadFlags.__EXIT_REASON_DEFAULT
         self.address = address
         self.stop_flag = False
 
+def _check_readable(path: str, description: str) -> None:
+    """
+    Raise FileNotFoundError unless path can be opened for reading. Opening the file checks the existence
+    and the permissions at once, instead of a stat followed by an access check.
+    """
+    try:
+        with open(path, "rb"): # fails for missing or unreadable files, and for directories
+            pass
+    except OSError:
+        raise FileNotFoundError(f"{description} {path} does not exist or is not readable.") from None
+
+def create_server_ssl_context(
+    certfile: Optional[str] = None,
+    keyfile: Optional[str] = None,
+    cafile: Optional[str] = None,
+    num_tickets: int = 2
+) -> Optional[ssl.SSLContext]:
+    """
+    Create the server side TLS context from the given files. Returns None if TLS isn't used (no certfile and keyfile).
+
+    :param certfile: The path to the server certificate file.
+    :param keyfile: The path to the server private key file.
+    :param cafile: The path to the CA certificate file.
+    :param num_tickets: Number of TLS 1.3 session tickets sent to the client after a handshake, so that reconnecting clients can resume the session. 0 disables resumption.
+    """
+    # check values
+    if (certfile is None) != (keyfile is None):
+        raise ValueError("certfile and keyfile must both be provided or both be None.")
+    if cafile is not None and certfile is None:
+        raise ValueError("cafile can only be provided if certfile and keyfile are provided.\nThis means client authentication is enabled only if the server is able to present a certificate.")
+    
+    # check file paths
+    if certfile:
+        _check_readable(certfile, "Certificate file")
+    if keyfile:
+        _check_readable(keyfile, "Key file")
+    if cafile:
+        _check_readable(cafile, "CA file")
+    
+    # create SSL context if necessary
+    requireTLS = certfile is not None
+    if requireTLS:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile=certfile, keyfile=keyfile) # add the parameters so the server can present itself to the client
+        if cafile:
+            context.load_verify_locations(cafile=cafile) # add the CA file so the server can verify the client
+            context.verify_mode = ssl.CERT_REQUIRED # require the client to present a certificate
+        
+        context.options |= ssl.OP_NO_TLSv1 | ssl.OP_NO_TLSv1_1 | ssl.OP_NO_TLSv1_2 | ssl.OP_NO_SSLv2 | ssl.OP_NO_SSLv3 # disable older protocols
+        context.options &= ~ssl.OP_NO_TICKET # make sure session tickets are enabled, so reconnects skip the full handshake
+        context.num_tickets = num_tickets
+    else:
+        context = None
+    return context
+
+class _HostContexts:
+    """
+    TLS contexts for additional hostnames, selected with SNI during the handshake. The certificates
+    of each hostname are only loaded on the first handshake requesting it, and the context is reused
+    afterwards. Only used in the thread (or event loop) doing the handshakes.
+    """
+    __slots__ = ("logger", "num_tickets", "_params", "_contexts")
+    logger: logging.Logger
+    num_tickets: int
+    _params: dict[str, tuple[str, str, Optional[str]]]
+    _contexts: dict[str, ssl.SSLContext]
+
+    def __init__(self, logger: logging.Logger, num_tickets: int) -> None:
+        self.logger = logger
+        self.num_tickets = num_tickets
+        self._params = {}
+        self._contexts = {}
+
+    def add(self, hostname: str, certfile: str, keyfile: str, cafile: Optional[str]) -> None:
+        self._params[hostname.lower()] = (certfile, keyfile, cafile)
+        self._contexts.pop(hostname.lower(), None)
+
+    def sni_callback(self, sslsock: ssl.SSLObject, server_hostname: Optional[str], default_context: ssl.SSLContext) -> Optional[int]:
+        """The sni_callback of the default context. Switches to the context of the hostname, if registered."""
+        if server_hostname is None: # no SNI, use the default context
+            return None
+        hostname = server_hostname.lower()
+        context = self._contexts.get(hostname)
+        if context is None:
+            params = self._params.get(hostname)
+            if params is None: # unknown host, use the default context
+                return None
+            try:
+                context = create_server_ssl_context(*params, self.num_tickets)
+            except Exception:
+                self.logger.error("Error loading the TLS certificates for host %s", hostname, exc_info=True)
+                return ssl.ALERT_DESCRIPTION_INTERNAL_ERROR
+            self._contexts[hostname] = context
+        sslsock.context = context
+        return None
+
 class ThreadedHTTPServer:
     """Threaded HTTP server implementation."""
     SERVER_RUNNING: bool
     security_params_set: bool
     context: Optional[ssl.SSLContext]
+    _host_contexts: Optional[_HostContexts]
     routes: dict[str, callable]
+    _exact_routes: dict[bytes, callable] # the routes added with an exact path, keyed by the raw path bytes
+    _routes_b: Mapping[bytes, callable] # read-only copy of _exact_routes, rebuilt (frozen) each time the server runs
+    _pattern_routes: routing.PatternRoutes # routes added with a pattern, compiled when the server runs
 
     host: str
     port: int
@@ -34,13 +152,29 @@ class ThreadedHTTPServer:
     timeout: float
     max_recv_calls_per_request: int
     max_content_length: int
+    max_workers: int
+    _pool: Optional[concurrent.futures.ThreadPoolExecutor] # created for each run, so that the server can be run again after stopping
+    _done_q: queue.SimpleQueue # flags of the finished client threads, put by the worker threads
+    _stop_r: Optional[socket.socket] # socketpair waking up the server loop on stop(). Sockets rather than a pipe, so that selectors can wait on them on every platform
+    _stop_w: Optional[socket.socket]
+    _local: threading.local # per worker thread state
+    socket_buffer_size: Optional[int]
+    backlog: int
+    backend: str
+    num_acceptors: int
+    _acceptors_stop: Optional[multiprocessing.synchronize.Event]
     
     def __init__(self,
                  host: str, port: int,
                  logger: logging.Logger,
                  timeout: float=5.0,
                  max_recv_calls_per_request: int=1024,
-                 max_content_length: int=512 * 1024 * 1024) -> None:
+                 max_content_length: int=512 * 1024 * 1024,
+                 max_workers: Optional[int]=None,
+                 num_acceptors: int=1,
+                 backend: str="selector",
+                 socket_buffer_size: Optional[int]=None,
+                 backlog: int=socket.SOMAXCONN) -> None:
         """
         Initialize the API server with the given host and port.
 
@@ -50,11 +184,29 @@ class ThreadedHTTPServer:
         :param timeout: Timeout for socket operations. Default is 5 seconds.
         :param max_recv_calls_per_request: Maximum number of recv calls to make for a single request. Default is 1024, correpsonding to 4MB (4096 bytes * 1024).
         :param max_content_length: Maximum allowed length of the request body, in bytes. Default is 512MB.
+        :param max_workers: Number of worker threads handling the client connections. Default is 256. A connection holds its worker from accept
+                            until it is answered or times out, so with more than max_workers idle or slow clients the other requests wait
+                            for up to timeout seconds. Lower values bound the memory and context switches under load, at that risk.
+        :param num_acceptors: Number of processes accepting connections on the same port with SO_REUSEPORT, so that the kernel balances
+                              the connections between them. Default is 1. If larger than 1, .run() forks num_acceptors - 1 child processes
+                              (Unix only), each with their own worker pool; the routes must therefore not rely on state shared between requests.
+        :param backend: How the connections are accepted. "selector" (default) waits on the listen socket with the selectors module,
+                        "io_uring" keeps multiple accepts in flight in an io_uring (Linux 5.5+, requires the liburing package).
+                        Only accept goes through io_uring, the requests are read and answered with regular socket calls in the workers.
+        :param socket_buffer_size: If given, the send and receive buffer sizes (SO_SNDBUF, SO_RCVBUF) of the client sockets, in bytes.
+                                   Small buffers (e.g. 64KB) keep small-response workloads cache friendly, but limit the throughput of
+                                   large bodies. Default is None, which keeps the kernel defaults (auto-tuned on Linux).
+        :param backlog: Maximum number of pending connections in the listen queue, before the kernel drops new connects. Default is socket.SOMAXCONN,
+                        increase (together with net.core.somaxconn) for high connect-rate workloads (e.g., ab, wrk).
         """
         self.SERVER_RUNNING = False
         self.security_params_set = False
         self.context = None
+        self._host_contexts = None
         self.routes = {}
+        self._exact_routes = {}
+        self._routes_b = types.MappingProxyType(self._exact_routes)
+        self._pattern_routes = routing.PatternRoutes()
 
         self.host = host
         self.port = port
@@ -62,12 +214,32 @@ class ThreadedHTTPServer:
         self.timeout = timeout
         self.max_recv_calls_per_request = max_recv_calls_per_request
         self.max_content_length = max_content_length
+        self.max_workers = max_workers if max_workers is not None else _DEFAULT_MAX_WORKERS
+        self._pool = None
+        self._done_q = queue.SimpleQueue()
+        self._stop_r = None
+        self._stop_w = None
+        self._local = threading.local()
+        self.socket_buffer_size = socket_buffer_size
+        self.backlog = backlog
+        if num_acceptors < 1:
+            raise ValueError("num_acceptors must be at least 1.")
+        if num_acceptors > 1 and not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("Multiple acceptors require SO_REUSEPORT, which is not supported on this platform.")
+        self.num_acceptors = num_acceptors
+        self._acceptors_stop = None
+        if backend not in ("selector", "io_uring"):
+            raise ValueError("backend must be either \"selector\" or \"io_uring\".")
+        if backend == "io_uring" and not uring.is_available():
+            raise ImportError("The io_uring backend requires the liburing package (pip install liburing).")
+        self.backend = backend
     
     def set_security_parameters(
         self,
         certfile: Optional[str] = None,
         keyfile: Optional[str] = None,
-        cafile: Optional[str] = None
+        cafile: Optional[str] = None,
+        num_tickets: int = 2
     ) -> None:
         """
         Set up TLS parameters. This should be called before starting the server.
@@ -75,48 +247,65 @@ class ThreadedHTTPServer:
         :param certfile: The path to the server certificate file.
         :param keyfile: The path to the server private key file.
         :param cafile: The path to the CA certificate file.
+        :param num_tickets: Number of TLS 1.3 session tickets issued per handshake for session resumption. Default is 2, 0 disables resumption.
         """
-        # check values
         if self.security_params_set:
             raise RuntimeError("Connection security parameters can only be set once.")
-        if (certfile is None) != (keyfile is None):
-            raise ValueError("certfile and keyfile must both be provided or both be None.")
-        if cafile is not None and certfile is None:
-            raise ValueError("cafile can only be provided if certfile and keyfile are provided.\nThis means client authentication is enabled only if the server is able to present a certificate.")
-        
-        # check file paths
-        if certfile and not (os.path.exists(certfile) and os.access(certfile, os.R_OK)):
-            raise FileNotFoundError(f"Certificate file {certfile} does not exist or is not readable.")
-        if keyfile and not (os.path.exists(keyfile) and os.access(keyfile, os.R_OK)):
-            raise FileNotFoundError(f"Key file {keyfile} does not exist or is not readable.")
-        if cafile and not (os.path.exists(cafile) and os.access(cafile, os.R_OK)):
-            raise FileNotFoundError(f"CA file {cafile} does not exist or is not readable.")
-        
-        # create SSL context if necessary
-        requireTLS = certfile is not None
-        if requireTLS:
-            self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-            self.context.load_cert_chain(certfile=certfile, keyfile=keyfile) # add the parameters so the server can present itself to the client
-            if cafile:
-                self.context.load_verify_locations(cafile=cafile) # add the CA file so the server can verify the client
-                self.context.verify_mode = ssl.CERT_REQUIRED # require the client to present a certificate
-            
-            self.context.options |= ssl.OP_NO_TLSv1 | ssl.OP_NO_TLSv1_1 | ssl.OP_NO_TLSv1_2 | ssl.OP_NO_SSLv2 | ssl.OP_NO_SSLv3 # disable older protocols
-        else:
-            self.context = None
+        self.context = create_server_ssl_context(certfile, keyfile, cafile, num_tickets)
+        if self.context is not None:
+            self._host_contexts = _HostContexts(self.logger, num_tickets)
+            self.context.sni_callback = self._host_contexts.sni_callback
         self.security_params_set = True
+
+    def add_host_certificate(
+        self,
+        hostname: str,
+        certfile: str,
+        keyfile: str,
+        cafile: Optional[str] = None
+    ) -> None:
+        """
+        Serve a different certificate to the clients requesting the given hostname (with SNI). The files are
+        loaded on the first connection to the hostname, and reused afterwards. Other hostnames use the certificate
+        of set_security_parameters, which must have been called with TLS enabled.
+
+        :param hostname: The hostname requested by the client.
+        :param certfile: The path to the certificate file of the hostname.
+        :param keyfile: The path to the private key file of the hostname.
+        :param cafile: The path to the CA certificate file, to verify the clients connecting to the hostname.
+        """
+        if self._host_contexts is None:
+            raise RuntimeError("TLS must be enabled with set_security_parameters before adding host certificates.")
+        if self.SERVER_RUNNING:
+            raise ValueError("Cannot add host certificates while the server is running.")
+        self._host_contexts.add(hostname, certfile, keyfile, cafile)
     
-    def route(self, path: str) -> None:
+    def route(self, path: str, pattern: Optional[str] = None) -> None:
         """
         Decorator to route a function to a specific path. The routes should
-        be initialized before starting the server, and cannot be changed.
-        
+        be initialized before starting the server, and cannot be changed while it runs
+        (routes added after stop() are used by the next run()).
+
+        If pattern is given, the function handles every path fully matching the regular expression
+        (e.g. r"/user/[0-9]+"); path is then only the name of the route in .routes. All patterns are
+        compiled into a single matcher (a hyperscan database if installed), and exact paths are always
+        looked up first. If several patterns match, the one routed first wins.
 
         :param path: The path to route the function to.
+        :param pattern: Optional regular expression of the paths to route the function to.
         """
         if self.SERVER_RUNNING:
             raise ValueError("Cannot add routes while the server is running.")
+        try:
+            path_bytes = path.encode("iso-8859-1") # same encoding as the parsed request line
+        except UnicodeEncodeError:
+            raise ValueError("The path must be encodable in ISO-8859-1.")
+        pattern_bytes = routing.encode_pattern(pattern) if pattern is not None else None
         def decorator(func):
+            if pattern_bytes is not None:
+                self._pattern_routes.add(pattern_bytes, func)
+            else:
+                self._exact_routes[path_bytes] = func
             self.routes[path] = func
             return func
         return decorator
@@ -125,105 +314,179 @@ class ThreadedHTTPServer:
         """
         Run in same thread as .run(). This is the main server loop.
         """
-        self.SERVER_RUNNING = True
-        client_threads: list[tuple[threading.Thread, _ThreadFlags]] = []
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http_client")
+        client_jobs: set[_ThreadFlags] = set() # flags of the client threads that are not finished yet
+        sel: Optional[selectors.BaseSelector] = None
+        acceptor: Optional[uring.UringAcceptor] = None
+        if self.backend == "io_uring":
+            server_socket.setblocking(True) # io_uring would fail the accepts with EAGAIN on a non-blocking socket, instead of waiting
+            acceptor = uring.UringAcceptor(server_socket, self._stop_r.fileno()) # the stop socket is written to by stop(), to break out of the wait
+            wait_connections = acceptor.wait
+        else:
+            sel = selectors.DefaultSelector()
+            sel.register(server_socket, selectors.EVENT_READ)
+            sel.register(self._stop_r, selectors.EVENT_READ) # written to by stop(), to break out of select
+            wait_connections = lambda: self.__select_connections(sel, server_socket)
+        # whether TLS is used is fixed once the server runs, so the per-connection setup is chosen once here
+        submit_connection = self.__submit_connection_tls if self.context is not None else self.__submit_connection_plain
         try:
             while self.SERVER_RUNNING:
-                # remove the finished threads
-                idx = 0
-                while idx < len(client_threads):
-                    if not client_threads[idx][0].is_alive():
-                        reason = client_threads[idx][1]
-                        client_threads.pop(idx)
-                        self.logger.debug("Client thread for {}:{} finished. Reason: {}".format(reason.address[0], reason.address[1], reason.exit_reason))
-                    else:
-                        idx += 1 # go next if its alive
-                
-                # accept a new connection
-                try:
-                    client_socket, addr = server_socket.accept()
-                except socket.timeout:
-                    continue
+                # remove the finished jobs
+                self.__reap_finished(client_jobs)
                 
-                self.logger.debug("Accepted connection from {}:{}".format(addr[0], addr[1]))
-                client_socket.settimeout(self.timeout) # set the timeout for the client socket
-                if self.context is not None: # wrap the socket in an SSL context, if necessary
-                    try:
-                        client_socket = self.context.wrap_socket(client_socket, server_side=True)
-                    except ssl.SSLError as e: # handle SSL errors, and close and skip the connection
-                        self.logger.error("Error setting up TLS connection from {}:{}".format(addr[0], addr[1]))
-                        self.logger.error(traceback.format_exc())
-                        client_socket.close() # close the socket
-                        continue # skip the connection
-                    except socket.timeout: # handle timeouts, and close and skip the connection
-                        self.logger.error("Timeout setting up TLS connection from {}:{}".format(addr[0], addr[1]))
-                        client_socket.close() # close the socket
-                        continue
-                
-                # all set, handle the client in a new thread
-                thread_flags = _ThreadFlags(addr)
-                thrd = threading.Thread(target=self.__handle_connection, args=(client_socket, addr, self, thread_flags))
-                thrd.start()
-                client_threads.append((thrd, thread_flags))
+                # block until new connections arrive or a stop is requested
+                for client_socket, addr in wait_connections():
+                    submit_connection(client_socket, addr, client_jobs)
         except KeyboardInterrupt:
             self.logger.info("Keyboard interrupt received. Shutting down server.")
         except Exception as e:
-            self.logger.error("Unexpected error in server loop.")
-            self.logger.error(traceback.format_exc())
+            self.logger.error("Unexpected error in server loop.", exc_info=True)
         finally:
             self.SERVER_RUNNING = False
+            if sel is not None:
+                sel.close()
+            if acceptor is not None:
+                acceptor.close()
             try:
                 server_socket.close() # close the server socket
             except Exception:
-                self.logger.error("Error closing server socket.")
-                self.logger.error(traceback.format_exc())
-        
-        self.logger.info("Waiting for all client threads to finish...")
-        self.logger.info("Remaining client threads: {}".format(len(client_threads)))
-        for thrd, reason in client_threads:
-            reason.stop_flag = True # signal the threads to stop
-        for thrd, reason in client_threads:
-            thrd.join()
-        self.logger.info("All client threads finished. Server shutdown complete.")
+                self.logger.error("Error closing server socket.", exc_info=True)
+            stop_r, stop_w = self._stop_r, self._stop_w
+            self._stop_r, self._stop_w = None, None
+            stop_r.close()
+            stop_w.close()
+
+            self.__reap_finished(client_jobs)
+            self.logger.info("Waiting for all client threads to finish...")
+            self.logger.info("Remaining client threads: %d", len(client_jobs))
+            for reason in client_jobs:
+                reason.stop_flag = True # signal the threads to stop
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self.__reap_finished(client_jobs) # drain the flags of this run, so that they are not carried over a restart
+            self.logger.info("All client threads finished. Server shutdown complete.")
+    
+    def __reap_finished(self, client_jobs: set[_ThreadFlags]) -> None:
+        """
+        Run in same thread as .run(). Removes the client threads that reported themselves as finished.
+        """
+        while True:
+            try:
+                reason = self._done_q.get_nowait()
+            except queue.Empty:
+                return
+            client_jobs.discard(reason)
+            self.logger.debug("Client thread for %s:%d finished. Reason: %s", reason.address[0], reason.address[1], reason.exit_reason)
+
+    def __select_connections(self, sel: selectors.BaseSelector, server_socket: socket.socket) -> collections.abc.Iterator[tuple[socket.socket, tuple[str, int]]]:
+        """
+        Run in same thread as .run(). Blocks until the listen socket or the stop socket is readable, and yields the accepted connection, if any.
+        """
+        for key, _ in sel.select():
+            if key.fileobj is server_socket:
+                try:
+                    yield server_socket.accept()
+                except BlockingIOError: # the pending connection was dropped before accept
+                    pass
+
+    def __setup_connection(self, client_socket: socket.socket, addr: tuple[str, int]) -> None:
+        """
+        Run in same thread as .run(). Sets the socket options of an accepted connection.
+        """
+        self.logger.debug("Accepted connection from %s:%d", addr[0], addr[1])
+        client_socket.settimeout(self.timeout) # set the timeout for the client socket, also used for the TLS handshake
+        try:
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # send the (mostly small) responses immediately
+            if hasattr(socket, "TCP_QUICKACK"): # Linux only
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            if self.socket_buffer_size is not None:
+                client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_buffer_size)
+                client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.socket_buffer_size)
+        except OSError: # the client may have already disconnected
+            self.logger.debug("Error setting the socket options of the connection from %s:%d", addr[0], addr[1], exc_info=True)
+
+    def __submit_to_pool(self, client_socket: socket.socket, addr: tuple[str, int], client_jobs: set[_ThreadFlags]) -> None:
+        """
+        Run in same thread as .run(). Handles the (set up) client in the worker pool.
+        """
+        thread_flags = _ThreadFlags(addr)
+        try:
+            self._pool.submit(self.__handle_connection, client_socket, addr, self, thread_flags)
+        except Exception: # no thread will own the socket
+            self.logger.error("Error submitting the connection from %s:%d to the worker pool.", addr[0], addr[1], exc_info=True)
+            client_socket.close()
+            return
+        client_jobs.add(thread_flags) # only once a worker thread will report it as finished
+
+    def __submit_connection_plain(self, client_socket: socket.socket, addr: tuple[str, int], client_jobs: set[_ThreadFlags]) -> None:
+        """
+        Run in same thread as .run(). Sets up an accepted connection and submits it to the worker pool, without TLS.
+        """
+        self.__setup_connection(client_socket, addr)
+        self.__submit_to_pool(client_socket, addr, client_jobs)
+
+    def __submit_connection_tls(self, client_socket: socket.socket, addr: tuple[str, int], client_jobs: set[_ThreadFlags]) -> None:
+        """
+        Run in same thread as .run(). Sets up an accepted connection, wraps it in the SSL context, and submits it to the worker pool.
+        """
+        self.__setup_connection(client_socket, addr)
+        try:
+            client_socket = self.context.wrap_socket(client_socket, server_side=True)
+        except ssl.SSLError as e: # handle SSL errors, and close and skip the connection
+            self.logger.error("Error setting up TLS connection from %s:%d", addr[0], addr[1], exc_info=True)
+            client_socket.close() # close the socket
+            return # skip the connection
+        except socket.timeout: # handle timeouts, and close and skip the connection
+            self.logger.error("Timeout setting up TLS connection from %s:%d", addr[0], addr[1])
+            client_socket.close() # close the socket
+            return
+        self.__submit_to_pool(client_socket, addr, client_jobs)
     
     def __handle_connection(self, client_socket: socket.socket, addr: tuple[str, int], server: 'ThreadedHTTPServer', flags: _ThreadFlags) -> None:
         """
         Run in a separate thread to handle a client connection.
         """
         try:
-            # read the request
-            request: Optional[http_parse.HttpRequest] = http_parse.parse_http_request(client_socket, self.max_recv_calls_per_request, self.max_content_length)
+            # read the request into the buffer of this worker thread
+            recv_buffer: Optional[memoryview] = getattr(self._local, "recv_buffer", None)
+            if recv_buffer is None:
+                recv_buffer = memoryview(bytearray(_RECV_BUFFER_SIZE))
+                self._local.recv_buffer = recv_buffer
+            request: Optional[http_parse.HttpRequest] = http_parse.parse_http_request(client_socket, self.max_recv_calls_per_request, self.max_content_length,
+                                                                                      buf=recv_buffer)
             if request is None:
                 flags.exit_reason = "Bad request."
                 try:
-                    http_write.send_http_response(client_socket, 400, {}, "Bad Request")
+                    client_socket.sendall(_ERR_400)
                 except Exception:
                     pass
                 return # no data available yet, return
             if request.has_error():
                 flags.exit_reason = "Error parsing request. Error: {}".format(request.error_msg())
                 try:
-                    http_write.send_http_response(client_socket, 500, {}, "Internal Server Error")
+                    client_socket.sendall(_ERR_500)
                 except Exception:
                     pass
                 return # error parsing request, return
             
             # get the path
-            path = request.get_path()
+            path = request.get_path_bytes()
             if path is None:
                 flags.exit_reason = "No path in request."
                 try:
-                    http_write.send_http_response(client_socket, 400, {}, "Bad Request")
+                    client_socket.sendall(_ERR_400)
                 except Exception:
                     pass
                 return
             
             # get the function
-            func = server.routes.get(path, None)
+            func = server._routes_b.get(path, None)
+            if func is None and server._pattern_routes:
+                func = server._pattern_routes.match(path)
             if func is None:
                 flags.exit_reason = "Path not found."
                 try:
-                    http_write.send_http_response(client_socket, 404, {}, "Not Found")
+                    client_socket.sendall(_ERR_404)
                 except Exception as e:
                     pass
                 return
@@ -234,41 +497,105 @@ class ThreadedHTTPServer:
                 flags.exit_reason = "All okay."
             except Exception as e:
                 flags.exit_reason = "Error calling function."
-                self.logger.debug("Error calling function for path {}: {}".format(path, e))
-                self.logger.debug("\n".join(traceback.format_exception(type(e), e, e.__traceback__)))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Error calling function for path %s", path, exc_info=e)
                 try:
-                    http_write.send_http_response(client_socket, 500, {}, "Internal Server Error")
+                    client_socket.sendall(_ERR_500)
                 except Exception:
                     pass
                 return # error calling function, return
             
         except Exception as e:
             flags.exit_reason = "Unexpected error."
-            server.logger.error("Unexpected error in client thread.")
-            server.logger.error(traceback.format_exc())
+            server.logger.error("Unexpected error in client thread.", exc_info=True)
         finally:
             try:
                 client_socket.close() # close the client socket
             except Exception:
                 pass
+            self._done_q.put(flags) # tell the server loop that this client thread finished
 
     def run(self, allow_reuse: bool=False) -> None:
         """
-        Start the API server to accept connections. A blocking call, doesn't return until the server is stopped (Ctrl+C).
+        Start the API server to accept connections. A blocking call, doesn't return until the server is stopped (Ctrl+C or .stop()).
         Doesn't start a new thread, so it should be called in a separate thread if necessary.
         """
         if not self.security_params_set:
             raise RuntimeError("Connection security parameters must be set before starting the server.")
         self.SERVER_RUNNING = True
+        self._routes_b = types.MappingProxyType(dict(self._exact_routes)) # routes added after a stop are picked up by the next run
+        self._pattern_routes.compile()
+
+        # fork the other acceptors, if necessary
+        children: list[int] = []
+        if self.num_acceptors > 1:
+            self._acceptors_stop = multiprocessing.get_context("fork").Event()
+            for _ in range(self.num_acceptors - 1):
+                pid = os.fork()
+                if pid == 0:
+                    self.__run_child_acceptor(allow_reuse) # never returns
+                children.append(pid)
+        
+        try:
+            self.__serve(allow_reuse)
+        finally:
+            if self._acceptors_stop is not None:
+                self.logger.info("Waiting for the other acceptor processes to finish...")
+                self._acceptors_stop.set() # signal the children to stop
+                for pid in children:
+                    os.waitpid(pid, 0)
+                self._acceptors_stop = None
+
+    def __run_child_acceptor(self, allow_reuse: bool) -> None:
+        """
+        Run in a forked child process. Serves until the parent signals the stop, then exits the process.
+        """
+        exit_code = 0
+        try:
+            threading.Thread(target=self.__await_acceptors_stop, daemon=True).start()
+            self.__serve(allow_reuse)
+        except BaseException:
+            self.logger.error("Unexpected error in acceptor process %d.", os.getpid(), exc_info=True)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
 
+    def __await_acceptors_stop(self) -> None:
+        """
+        Run in a separate thread in the child acceptor processes. Stops the server when the parent process stops.
+        """
+        self._acceptors_stop.wait()
+        self.stop()
+
+    def __serve(self, allow_reuse: bool) -> None:
+        """
+        Run in same thread as .run(). Binds the listen socket of this process and accepts connections.
+        """
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
             if allow_reuse:
                 server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.num_acceptors > 1:
+                server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1) # every acceptor binds its own socket on the same port
             server_socket.bind((self.host, self.port)) # bind to the host and port
-            server_socket.listen(5) # allow up to 5 connections in the queue
-            server_socket.settimeout(0.5) # set a timeout for the accept call to 0.5 seconds
+            server_socket.listen(self.backlog)
+            server_socket.setblocking(False) # readiness is awaited with a selector, so accept must never block
             if self.logger is not None:
                 self.logger.info(f"Server listening on {self.host}:{self.port} {'with TLS' if (self.context is not None) else 'without TLS'}")
             
             # loop to accept connections
-            self.__run_impl(server_socket)
\ No newline at end of file
+            self._stop_r, self._stop_w = socket.socketpair()
+            self._stop_w.setblocking(False) # stop() must never block, one pending byte is enough to wake up the loop
+            self.__run_impl(server_socket)
+
+    def stop(self) -> None:
+        """
+        Request the server to stop accepting connections. Can be called from any thread;
+        .run() returns once all the client threads have finished.
+        """
+        self.SERVER_RUNNING = False
+        stop_w = self._stop_w
+        if stop_w is not None:
+            try:
+                stop_w.send(b"x") # wake up the selector in the server loop
+            except OSError: # already closed by the server loop, or a wakeup is already pending
+                pass
\ No newline at end of file
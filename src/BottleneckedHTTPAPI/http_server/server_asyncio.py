@@ -0,0 +1,330 @@
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import os
+import socket
+import ssl
+import types
+from typing import Optional, Union, Mapping
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+from . import http_parse
+from . import http_write
+from . import routing
+from .server import create_server_ssl_context, _HostContexts, _ERR_400, _ERR_404, _ERR_500
+
+async def send_http_response_async(
+    writer: asyncio.StreamWriter,
+    status_code: int,
+    headers: dict[str, str],
+    body: Optional[Union[str, bytes]] = None
+) -> None:
+    """
+    Constructs and sends an HTTP/1.1 response over the provided asyncio stream.
+
+    Args:
+        writer (asyncio.StreamWriter): The stream to send the response through.
+        status_code (int): The HTTP status code (e.g., 200, 404).
+        headers (dict[str, str]): A dictionary of HTTP headers.
+        body (Optional[bytes]): The response body as bytes. Defaults to None.
+    """
+    response_bytes, body = http_write.encode_http_response(status_code, headers, body)
+    writer.write(response_bytes)
+    if body:
+        writer.write(body)
+    await writer.drain()
+
+class _StreamSocketAdapter:
+    """
+    Socket-like wrapper of an asyncio stream, so that synchronous route functions
+    (which expect a socket) can run in a worker thread. Only sendall is supported.
+    """
+    __slots__ = ("_writer", "_loop", "_timeout")
+
+    def __init__(self, writer: asyncio.StreamWriter, loop: asyncio.AbstractEventLoop, timeout: float) -> None:
+        self._writer = writer
+        self._loop = loop
+        self._timeout = timeout
+
+    async def __write(self, data: bytes) -> None:
+        self._writer.write(data)
+        await self._writer.drain()
+
+    def sendall(self, data: bytes) -> None:
+        """Write the data to the stream. Raises socket.timeout if the client doesn't read it within the timeout, like the sockets of ThreadedHTTPServer."""
+        future = asyncio.run_coroutine_threadsafe(self.__write(bytes(data)), self._loop)
+        try:
+            future.result(self._timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise socket.timeout("timed out") from None
+
+class AsyncHTTPServer:
+    """
+    Single threaded asyncio HTTP server implementation, with the same routing API as ThreadedHTTPServer.
+    Uses uvloop if it is installed.
+
+    Routes can be coroutine functions taking in [HttpRequest, asyncio.StreamWriter], which should use
+    send_http_response_async, or synchronous functions as in ThreadedHTTPServer that only reply through
+    sendall (e.g. with send_http_response). These are run in a thread pool and receive a socket-like object
+    supporting only sendall, which times out after timeout seconds.
+    """
+    SERVER_RUNNING: bool
+    security_params_set: bool
+    context: Optional[ssl.SSLContext]
+    _host_contexts: Optional[_HostContexts]
+    routes: dict[str, callable]
+    _exact_routes: dict[bytes, callable] # the routes added with an exact path, keyed by the raw path bytes
+    _routes_b: Mapping[bytes, callable] # read-only copy of _exact_routes, rebuilt (frozen) each time the server runs
+    _pattern_routes: routing.PatternRoutes
+
+    host: str
+    port: int
+    logger: logging.Logger
+    timeout: float
+    max_recv_calls_per_request: int
+    max_content_length: int
+    max_workers: int
+    backlog: int
+    _pool: Optional[concurrent.futures.ThreadPoolExecutor] # created for each run, so that the server can be run again after stopping
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _stop_event: Optional[asyncio.Event]
+    _stop_requested: bool # set by stop(), so that a stop before the event loop is up isn't lost
+
+    def __init__(self,
+                 host: str, port: int,
+                 logger: logging.Logger,
+                 timeout: float=5.0,
+                 max_recv_calls_per_request: int=1024,
+                 max_content_length: int=512 * 1024 * 1024,
+                 max_workers: Optional[int]=None,
+                 backlog: int=socket.SOMAXCONN) -> None:
+        """
+        Initialize the API server with the given host and port.
+
+        :param host: The host to bind the server to.
+        :param port: The port to bind the server to.
+        :param logger: Logger to use for logging.
+        :param timeout: Timeout for reading the request head and body, and for the TLS handshake. Default is 5 seconds.
+        :param max_recv_calls_per_request: Bounds the size of the request head to 4096 bytes * max_recv_calls_per_request, same as ThreadedHTTPServer. Default is 1024 (4MB).
+        :param max_content_length: Maximum allowed length of the request body, in bytes. Default is 512MB.
+        :param max_workers: Number of worker threads running the synchronous route functions. Default is os.cpu_count().
+        :param backlog: Maximum number of pending connections in the listen queue. Default is socket.SOMAXCONN, increase for high connect-rate workloads (e.g., ab, wrk).
+        """
+        self.SERVER_RUNNING = False
+        self.security_params_set = False
+        self.context = None
+        self._host_contexts = None
+        self.routes = {}
+        self._exact_routes = {}
+        self._routes_b = types.MappingProxyType(self._exact_routes)
+        self._pattern_routes = routing.PatternRoutes()
+
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self.timeout = timeout
+        self.max_recv_calls_per_request = max_recv_calls_per_request
+        self.max_content_length = max_content_length
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.backlog = backlog
+        self._pool = None
+        self._loop = None
+        self._stop_event = None
+        self._stop_requested = False
+
+    def set_security_parameters(
+        self,
+        certfile: Optional[str] = None,
+        keyfile: Optional[str] = None,
+        cafile: Optional[str] = None,
+        num_tickets: int = 2
+    ) -> None:
+        """
+        Set up TLS parameters. This should be called before starting the server.
+
+        :param certfile: The path to the server certificate file.
+        :param keyfile: The path to the server private key file.
+        :param cafile: The path to the CA certificate file.
+        :param num_tickets: Number of TLS 1.3 session tickets issued per handshake for session resumption. Default is 2, 0 disables resumption.
+        """
+        if self.security_params_set:
+            raise RuntimeError("Connection security parameters can only be set once.")
+        self.context = create_server_ssl_context(certfile, keyfile, cafile, num_tickets)
+        if self.context is not None:
+            self._host_contexts = _HostContexts(self.logger, num_tickets)
+            self.context.sni_callback = self._host_contexts.sni_callback
+        self.security_params_set = True
+
+    def add_host_certificate(
+        self,
+        hostname: str,
+        certfile: str,
+        keyfile: str,
+        cafile: Optional[str] = None
+    ) -> None:
+        """
+        Serve a different certificate to the clients requesting the given hostname (with SNI). See ThreadedHTTPServer.add_host_certificate.
+
+        :param hostname: The hostname requested by the client.
+        :param certfile: The path to the certificate file of the hostname.
+        :param keyfile: The path to the private key file of the hostname.
+        :param cafile: The path to the CA certificate file, to verify the clients connecting to the hostname.
+        """
+        if self._host_contexts is None:
+            raise RuntimeError("TLS must be enabled with set_security_parameters before adding host certificates.")
+        if self.SERVER_RUNNING:
+            raise ValueError("Cannot add host certificates while the server is running.")
+        self._host_contexts.add(hostname, certfile, keyfile, cafile)
+
+    def route(self, path: str, pattern: Optional[str] = None) -> None:
+        """
+        Decorator to route a function (or coroutine function) to a specific path. The routes should
+        be initialized before starting the server, and cannot be changed while it runs. See ThreadedHTTPServer.route for pattern routes.
+
+        :param path: The path to route the function to.
+        :param pattern: Optional regular expression of the paths to route the function to.
+        """
+        if self.SERVER_RUNNING:
+            raise ValueError("Cannot add routes while the server is running.")
+        try:
+            path_bytes = path.encode("iso-8859-1") # same encoding as the parsed request line
+        except UnicodeEncodeError:
+            raise ValueError("The path must be encodable in ISO-8859-1.")
+        pattern_bytes = routing.encode_pattern(pattern) if pattern is not None else None
+        def decorator(func):
+            if pattern_bytes is not None:
+                self._pattern_routes.add(pattern_bytes, func)
+            else:
+                self._exact_routes[path_bytes] = func
+            self.routes[path] = func
+            return func
+        return decorator
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Run in the event loop to handle a client connection.
+        """
+        addr = writer.get_extra_info("peername")
+        self.logger.debug("Accepted connection from %s:%d", addr[0], addr[1])
+        try:
+            request: Optional[http_parse.HttpRequest] = await http_parse.parse_http_request_async(reader, self.timeout, self.max_content_length)
+            if request is None:
+                await self.__send_error(writer, _ERR_400)
+                return
+            if request.has_error():
+                self.logger.debug("Error parsing request from %s:%d. Error: %s", addr[0], addr[1], request.error_msg())
+                await self.__send_error(writer, _ERR_500)
+                return
+
+            # get the path and the function
+            path = request.get_path_bytes()
+            if path is None:
+                await self.__send_error(writer, _ERR_400)
+                return
+            func = self._routes_b.get(path, None)
+            if func is None and self._pattern_routes:
+                func = self._pattern_routes.match(path)
+            if func is None:
+                await self.__send_error(writer, _ERR_404)
+                return
+
+            # call the function, let the function handle the HTTP response
+            try:
+                if inspect.iscoroutinefunction(func):
+                    await func(request, writer)
+                else:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(self._pool, func, request, _StreamSocketAdapter(writer, loop, self.timeout))
+            except Exception as e:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Error calling function for path %s", path, exc_info=e)
+                await self.__send_error(writer, _ERR_500)
+        except Exception:
+            self.logger.error("Unexpected error in client connection.", exc_info=True)
+        finally:
+            try:
+                writer.close()
+                await asyncio.wait_for(writer.wait_closed(), self.timeout) # waits for the buffered data to be sent
+            except Exception: # the client isn't reading, drop the buffered data
+                writer.transport.abort()
+
+    async def __send_error(self, writer: asyncio.StreamWriter, response_bytes: bytes) -> None:
+        try:
+            writer.write(response_bytes)
+            await asyncio.wait_for(writer.drain(), self.timeout) # the client may not be reading (e.g. after a route timed out)
+        except Exception:
+            pass
+
+    async def __serve(self, allow_reuse: bool) -> None:
+        """
+        Run in the event loop. Accepts connections until stop() is called.
+        """
+        self._stop_event = asyncio.Event()
+        server = await asyncio.start_server(
+            self.__handle_connection, self.host, self.port,
+            ssl=self.context,
+            ssl_handshake_timeout=self.timeout if self.context is not None else None,
+            reuse_address=allow_reuse,
+            backlog=self.backlog,
+            limit=4096 * self.max_recv_calls_per_request
+        )
+        self.logger.info(f"Server listening on {self.host}:{self.port} {'with TLS' if (self.context is not None) else 'without TLS'}{' (uvloop)' if uvloop is not None else ''}")
+        if self._stop_requested: # stop() was called before _stop_event existed
+            self._stop_event.set()
+        async with server:
+            await self._stop_event.wait()
+
+    def run(self, allow_reuse: bool=False) -> None:
+        """
+        Start the API server to accept connections. A blocking call, doesn't return until the server is stopped (Ctrl+C or .stop()).
+        Runs the event loop in the calling thread.
+        """
+        if not self.security_params_set:
+            raise RuntimeError("Connection security parameters must be set before starting the server.")
+        self.SERVER_RUNNING = True
+        self._routes_b = types.MappingProxyType(dict(self._exact_routes)) # same as ThreadedHTTPServer.run
+        self._pattern_routes.compile()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http_route")
+
+        loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+        self._loop = loop
+        serve = loop.create_task(self.__serve(allow_reuse))
+        try:
+            loop.run_until_complete(serve)
+        except KeyboardInterrupt:
+            self.logger.info("Keyboard interrupt received. Shutting down server.")
+        finally:
+            self.SERVER_RUNNING = False
+            self._loop = None
+            try:
+                # stop accepting (after Ctrl+C the serve task is still waiting for the stop event), then let the pending connection handlers finish
+                if not serve.done():
+                    serve.cancel()
+                    loop.run_until_complete(asyncio.gather(serve, return_exceptions=True))
+                pending = asyncio.all_tasks(loop)
+                if pending:
+                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self._stop_event = None
+            self._stop_requested = False
+        self.logger.info("Server shutdown complete.")
+
+    def stop(self) -> None:
+        """
+        Request the server to stop accepting connections. Can be called from any thread.
+        If called before the server is up (e.g. while run() is starting), run() returns as soon as the server has started.
+        """
+        self._stop_requested = True # checked by __serve once _stop_event exists, in case the event isn't available below yet
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None:
+            loop.call_soon_threadsafe(stop_event.set)
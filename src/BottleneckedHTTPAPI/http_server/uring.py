@@ -0,0 +1,120 @@
+import collections
+import os
+import socket
+import select
+from typing import Iterator
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+# user_data tags of the submitted operations
+_ACCEPT = 1
+_WAKEUP = 2
+
+def is_available() -> bool:
+    """Whether the liburing bindings are installed."""
+    return liburing is not None
+
+class UringAcceptor:
+    """
+    Accepts connections on a listen socket with io_uring (Linux 5.5+, requires the liburing package).
+    Several accept operations are kept in flight, so that a burst of connections is reaped with a
+    single submission and wait. The wakeup fd is polled in the same ring, so writing to it interrupts wait().
+
+    Only used in the thread running the server loop.
+    """
+    __slots__ = ("_server_socket", "_wakeup_fd", "_depth", "_ring", "_cqe", "_in_flight", "_pending")
+
+    def __init__(self, server_socket: socket.socket, wakeup_fd: int, depth: int = 64) -> None:
+        """
+        :param server_socket: The listening socket.
+        :param wakeup_fd: A readable fd that signals the stop of the server loop.
+        :param depth: The number of io_uring submission queue entries. depth - 1 accepts are kept in flight.
+        """
+        if liburing is None:
+            raise ImportError("The io_uring backend requires the liburing package (pip install liburing).")
+        if depth < 2:
+            raise ValueError("The io_uring depth must be at least 2.")
+        self._server_socket = server_socket
+        self._wakeup_fd = wakeup_fd
+        self._depth = depth
+        self._ring = liburing.io_uring()
+        self._cqe = liburing.io_uring_cqe()
+        liburing.io_uring_queue_init(depth, self._ring, 0)
+
+        self.__prep_wakeup()
+        self._in_flight = 0
+        self._pending: collections.deque[int] = collections.deque() # fds accepted by reaped completions, not handed out yet
+        for _ in range(depth - 1):
+            self.__prep_accept()
+
+    def __prep_accept(self) -> None:
+        sqe = liburing.io_uring_get_sqe(self._ring)
+        liburing.io_uring_prep_accept(sqe, self._server_socket.fileno(), None, socket.SOCK_CLOEXEC)
+        liburing.io_uring_sqe_set_data64(sqe, _ACCEPT)
+        self._in_flight += 1
+
+    def __prep_wakeup(self) -> None:
+        sqe = liburing.io_uring_get_sqe(self._ring)
+        liburing.io_uring_prep_poll_add(sqe, self._wakeup_fd, select.POLLIN)
+        liburing.io_uring_sqe_set_data64(sqe, _WAKEUP)
+
+    def __peek(self) -> bool:
+        """Whether another completion is ready, without blocking."""
+        try:
+            return liburing.io_uring_peek_cqe(self._ring, self._cqe) == 0
+        except (BlockingIOError, InterruptedError):
+            return False
+
+    def wait(self) -> Iterator[tuple[socket.socket, tuple[str, int]]]:
+        """
+        Submit the pending operations and block until at least one completes, then reap all the ready completions.
+        Yields (socket, address) for every connection accepted by them, also if the wakeup fd became readable in the
+        same batch (so nothing already accepted is lost), and yields nothing if only the wakeup completed. After a wakeup
+        the accepts are no longer re-armed. The connections not handed out before close() are closed there.
+        """
+        liburing.io_uring_submit(self._ring)
+        liburing.io_uring_wait_cqe(self._ring, self._cqe)
+        accepted = self._pending
+        woken = False
+        while True:
+            res, user_data = self._cqe.res, self._cqe.user_data
+            liburing.io_uring_cqe_seen(self._ring, self._cqe)
+            if user_data == _WAKEUP:
+                woken = True
+            else:
+                self._in_flight -= 1
+                if res >= 0:
+                    accepted.append(res)
+            if not self.__peek():
+                break
+
+        # re-arm the completed accepts before handing out the connections
+        if not woken:
+            while self._in_flight < self._depth - 1:
+                self.__prep_accept()
+        while accepted:
+            fd = accepted.popleft()
+            client_socket = socket.socket(fileno=fd)
+            try:
+                addr = client_socket.getpeername()
+            except OSError: # already disconnected
+                client_socket.close()
+                continue
+            yield client_socket, addr
+
+    def close(self) -> None:
+        """
+        Release the ring. The in-flight operations are cancelled, and the connections that were already
+        accepted but not handed out by wait() (reaped, or still in the completion queue) are closed.
+        """
+        while self._pending:
+            os.close(self._pending.popleft())
+        while self.__peek():
+            res, user_data = self._cqe.res, self._cqe.user_data
+            liburing.io_uring_cqe_seen(self._ring, self._cqe)
+            if user_data == _ACCEPT and res >= 0:
+                os.close(res)
+        liburing.io_uring_queue_exit(self._ring)
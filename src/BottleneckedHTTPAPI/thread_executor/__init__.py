@@ -1,3 +1,3 @@
-from .request_and_response import AbstractRequest, AbstractResponse, ErrorResponse, CancelledResponse
+from .request_and_response import AbstractRequest, AbstractResponse, ErrorResponse, CancelledResponse, ResponseStatus
 from .abstract_executor import AbstractSingleThreadExecutor, PoolFullException
 from .router import SingleThreadExecutorRouterWrapper
\ No newline at end of file
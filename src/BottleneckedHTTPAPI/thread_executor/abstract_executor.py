@@ -1,11 +1,12 @@
-from typing import Optional, Any
+from typing import Optional, Any, Sequence, Mapping
 import os
-import hashlib
 import threading
 import logging
 import traceback
 import abc
 import time
+import collections
+import queue
 
 from .request_and_response import AbstractRequest, AbstractResponse, ErrorResponse, CancelledResponse
 
@@ -21,26 +22,27 @@ class AbstractSingleThreadExecutor(abc.ABC):
     # Logger for logging events
     logger: logging.Logger
 
-    # Locks for thread-safe operations
-    __lock_external: threading.Lock
+    # Locks for thread-safe operations. The external state is guarded by one lock per structure, so that
+    # e.g. polls don't block enqueues. When nested, they are acquired in the order responses < cancel < lifecycle
+    __lock_responses: threading.Lock # __external_responses
+    __lock_cancel: threading.Lock # __external_requests_to_cancel
+    __lock_lifecycle: threading.Lock # __external_request_response_previous_action, __discarded
     __lock_internal: threading.Lock
     __status_lock: threading.Lock
-
-    # Attributes for storing the execution tokens
-    __seed: bytes
-    __itoken: int
-    __strtoken: Optional[str]
+    # single underscore (unlike the other internals), since executor_thread_runner is a module level function and cannot access mangled names
+    _wake: threading.Condition # wakes up the executor thread before loop_sleep elapses, when there is new work (or on stop)
+    _wake_pending: bool # guarded by _wake
+    _init_done: threading.Event # set by the executor thread once initialize() returns
 
     # External requests and responses
     __external_requests_to_cancel: list[str]
-    __external_requests_queue_data: dict[str, AbstractRequest]
-    __external_requests_queue: list[str]
+    __external_requests: queue.SimpleQueue[tuple[str, AbstractRequest]] # the queued (token, request) pairs (FIFO). Thread-safe without a Python level lock
     __external_responses: dict[str, AbstractResponse]
-    __external_request_response_previous_action: dict[str, float] # keeps track of the lifecycle, and the keys of this dictionary serves as the set of tokens (UID)
+    __external_request_response_previous_action: collections.OrderedDict[str, float] # keeps track of the lifecycle, and the keys of this dictionary serves as the set of tokens (UID). Ordered by time
+    __discarded: set[str] # tokens removed by discard_request before their response was published. The response is dropped when published
 
     # Internal requests and responses
-    __internal_requests_queue: list[str]
-    __internal_requests_data: dict[str, AbstractRequest]
+    __internal_requests: dict[str, AbstractRequest] # the requests being handled. Insertion ordered, so the keys are the queue (FIFO)
     __internal_responses: dict[str, AbstractResponse]
 
     # Control variables
@@ -49,6 +51,7 @@ class AbstractSingleThreadExecutor(abc.ABC):
     loop_sleep: float
     old_cleanup_time: float
     internal_iter_count: int
+    __next_cleanup: float # time.monotonic() of the next cleanup_old_responses by the executor thread
     max_handle_requests_and_responses: int
 
     def __init__(
@@ -63,7 +66,7 @@ class AbstractSingleThreadExecutor(abc.ABC):
 
         Args:
             logger (logging.Logger): Logger for logging events.
-            loop_sleep (float): Time in seconds the thread sleeps between iterations.
+            loop_sleep (float): Time in seconds between iterations while there are requests being handled. The thread is woken up earlier when requests are queued or cancelled. When idle, it only wakes up to clean up the expired responses (every 10 * loop_sleep).
             old_cleanup_time (float): Time in seconds to cleanup the response if idle for too long. Idle means the duration between the cleanup and end of processing response.
             max_handle_requests_and_responses (int): Maximum requests/responses to handle
         """
@@ -71,85 +74,121 @@ class AbstractSingleThreadExecutor(abc.ABC):
         self.loop_sleep = loop_sleep
         self.old_cleanup_time = old_cleanup_time
         self.internal_iter_count = 0
+        self.__next_cleanup = 0.0
         self.max_handle_requests_and_responses = max_handle_requests_and_responses
 
         # Initialize locks for thread safety
-        self.__lock_external = threading.Lock()
+        self.__lock_responses = threading.Lock()
+        self.__lock_cancel = threading.Lock()
+        self.__lock_lifecycle = threading.Lock()
         self.__lock_internal = threading.Lock()
         self.__status_lock = threading.Lock()
-
-        # Initialize token generation attributes
-        self.__seed = os.urandom(16)
-        self.__itoken = 0
-        self.__strtoken = None
-        self.generate_next_token()
+        self._wake = threading.Condition() # not __status_lock, which stop holds while joining the thread
+        self._wake_pending = False
+        self._init_done = threading.Event()
 
         # External requests and responses
         self.__external_requests_to_cancel = []
-        self.__external_requests_queue_data = {}
-        self.__external_requests_queue = []
+        self.__external_requests = queue.SimpleQueue()
         self.__external_responses = {}
-        self.__external_request_response_previous_action = {}
+        self.__external_request_response_previous_action = collections.OrderedDict()
+        self.__discarded = set()
 
         # Internal requests and responses
-        self.__internal_requests_queue = []
-        self.__internal_requests_data = {}
+        self.__internal_requests = {}
         self.__internal_responses = {}
 
         # Control variables
         self.running = False
         self._thread = None
     
-    def _process_iteration(self):
+    def _process_iteration(self, now: Optional[float] = None):
         """
         Processes a single iteration of the executor loop.
         Handles moving requests, processing them, and handling responses.
+
+        Args:
+            now (Optional[float]): The time.monotonic() at the start of the iteration, used for the cleanup of the iteration. Read if not given.
         """
+        if now is None:
+            now = time.monotonic()
         self.internal_iter_count += 1
 
-        # Move the requests to and from the internal and external queues
+        # Move the new requests to the internal queue, and handle the cancellations
         self.__move_external_to_internal()
-        self.__move_internal_to_external()
 
         # Handle cleanup
-        if self.internal_iter_count % 10 == 0:
-            self.cleanup_old_responses()
-
-        # Handle cancellations
-        self.__handle_cancellations()
+        if now >= self.__next_cleanup:
+            self.cleanup_old_responses(now=now)
+            self.__next_cleanup = now + 10 * self.loop_sleep
 
         # Process internal requests
         with self.__lock_internal:
             # ok, now give the impl to handle all data at the same time
-            queue_copy = self.__internal_requests_queue.copy() # shallow copy the data so the internal queue and data will only be handled by this class.
-            data_copy = self.__internal_requests_data.copy()
+            # the data is passed as is, accept/reject only remove the requests after _handle_all_requests returns
             try:
-                self._handle_all_requests(queue_copy, data_copy)
+                self._handle_all_requests(tuple(self.__internal_requests), self.__internal_requests)
             except BaseException as e:
                 self.logger.critical("Error occured in API implementation of _handle_all_requests! This may be irrecoverable! The loop is stopping...")
                 self.logger.critical("\n".join(traceback.format_exception(e)))
                 self.stop(await_thread_stop=False)
+            for token in self.__internal_responses: # remove the accepted/rejected requests
+                self.__internal_requests.pop(token, None)
+
+        # Publish the responses (including the ones of this iteration, so they don't wait for the next wakeup)
+        self.__move_internal_to_external()
     
+    def _next_iteration_deadline(self, start_time: float) -> Optional[float]:
+        """
+        The time.monotonic() at which the executor thread runs the next iteration if there is no new work,
+        or None to sleep until requests are queued or cancelled. Used internally - do not call this, even for subclasses!
+
+        Args:
+            start_time (float): The time.monotonic() at the start of the last iteration.
+        """
+        if self.__internal_requests: # not accepted/rejected yet, keep handling them every loop_sleep
+            return start_time + self.loop_sleep
+        if self.__external_request_response_previous_action: # responses not polled yet, wake up to expire them
+            return self.__next_cleanup
+        return None
+
     def __move_external_to_internal(self):
         """
-        Moves all external requests to the internal queue.
+        Moves all external requests to the internal queue, and cancels the requests marked for cancellation.
         Must be called from the executor thread.
         DO NOT use this in subclasses impl or externally!
         """
-        # Copy over
-        prev_external_requests: list[str]
-        prev_external_data: dict[str, AbstractRequest] = {}
-        with self.__lock_external:
-            prev_external_requests = self.__external_requests_queue.copy()
-            self.__external_requests_queue.clear()
-            for token in prev_external_requests:
-                prev_external_data[token] = self.__external_requests_queue_data.pop(token)
+        # Take the cancellations, then drain the queue. A token is queued before it can be cancelled, so every
+        # token in to_cancel is either in the drained requests or already internal. The drain is bounded, since
+        # queue_request refuses new requests once max_handle_requests_and_responses are in flight
+        to_cancel: list[str]
+        with self.__lock_cancel:
+            to_cancel = self.__external_requests_to_cancel
+            self.__external_requests_to_cancel = []
+        prev_external_requests: dict[str, AbstractRequest] = {}
+        get_nowait = self.__external_requests.get_nowait
+        while True:
+            try:
+                token, request = get_nowait()
+            except queue.Empty:
+                break
+            prev_external_requests[token] = request
         
         # Ok, now add to internal
         with self.__lock_internal:
-            for token in prev_external_requests:
-                self.__internal_requests_queue.append(token)
-                self.__internal_requests_data[token] = prev_external_data[token]
+            for token in to_cancel:
+                # If the request was still in the external queue, the implementation never saw it
+                dat = prev_external_requests.pop(token, None)
+                if dat is None:
+                    # If the request is still in the internal queue, remove it
+                    dat = self.__internal_requests.pop(token, None)
+                    if dat is None: # already finished, or invalid token
+                        continue
+                    self._handle_request_cancel(token, dat) # Tell implementation to cleanup resources for the request if necessary
+                response = CancelledResponse()
+                response._set_static_state(dat._static_state)
+                self.__internal_responses[token] = response
+            self.__internal_requests.update(prev_external_requests)
 
     def __move_internal_to_external(self):
         """
@@ -159,53 +198,22 @@ class AbstractSingleThreadExecutor(abc.ABC):
         """
         responses: dict[str, AbstractResponse]
         with self.__lock_internal:
-            responses = self.__internal_responses.copy()
-            self.__internal_responses.clear()
+            responses = self.__internal_responses
+            self.__internal_responses = {}
         
-        with self.__lock_external:
-            ctime = time.time()
+        with self.__lock_responses, self.__lock_lifecycle: # the time must be updated together, otherwise a cleanup may see the time of the request
+            # read under the lock, like queue_request, so that the times stay ordered. The start of the iteration may be older than the requests queued since
+            now = time.monotonic()
             for token in responses:
+                if self.__discarded:
+                    if token in self.__discarded: # no one will poll it, the token is already freed
+                        self.__discarded.remove(token)
+                        continue
                 response: AbstractResponse = responses[token]
                 self.__external_responses[token] = response
-                # update the time
-                self.__external_request_response_previous_action[token] = ctime
-
-    def __handle_cancellations(self):
-        """
-        Handles cancellation of requests marked for cancellation.
-        DO NOT use this in subclasses impl or externally!
-        """
-        to_cancel: list[str]
-        with self.__lock_external:
-            to_cancel = self.__external_requests_to_cancel.copy()
-            self.__external_requests_to_cancel.clear()
-
-        if len(to_cancel) == 0:
-            return
-        
-        with self.__lock_internal:
-            for token in to_cancel:
-                # If the request is still in the internal queue, remove it
-                if token in self.__internal_requests_queue:
-                    self.__internal_requests_queue.remove(token)
-                    dat = self.__internal_requests_data.pop(token)
-                    self._handle_request_cancel(token, dat) # Tell implementation to cleanup resources for the request if necessary
-                    response = CancelledResponse()
-                    response._set_static_state(dat._static_state)
-                    self.__internal_responses[response] = response
-        
-        with self.__lock_external:
-            ctime = time.time()
-            for token in to_cancel:
-                # If the request is still in the external queue, remove it
-                if token in self.__external_requests_queue:
-                    self.__external_requests_queue.remove(token)
-                    dat = self.__external_requests_queue_data.pop(token)
-                    response = CancelledResponse()
-                    response._set_static_state(dat._static_state)
-                    self.__external_responses[response] = response
-                    # update the time
-                    self.__external_request_response_previous_action[response.token] = ctime
+                # update the time, and keep the order by time
+                self.__external_request_response_previous_action[token] = now
+                self.__external_request_response_previous_action.move_to_end(token)
 
     def get_logger(self) -> logging.Logger:
         """
@@ -220,29 +228,30 @@ class AbstractSingleThreadExecutor(abc.ABC):
         """
         Accepts the request in handle_request. Note that this MUST be the last call.
         ONLY call this in the implementation of the handle_request branch in subclass.
+        Runs under the internal lock, which _process_iteration holds around _handle_all_requests.
         """
-        if token not in self.__internal_requests_queue:
+        dat = self.__internal_requests.get(token, None)
+        if dat is None or token in self.__internal_responses:
             raise ValueError("Cannot accept/reject the same token twice!")
         
-        # remove from queue, and put the response
-        self.__internal_requests_queue.remove(token)
-        dat = self.__internal_requests_data.pop(token)
-        self.__internal_responses[token] = response
+        # put the response, with its static state already set. the request is removed from the queue after _handle_all_requests returns
         response._set_static_state(dat._static_state)
+        self.__internal_responses[token] = response
     
     def reject(self, token: str, error_reason: str):
         """
         Rejects the request in handle_request. Note that this MUST be the last call.
         ONLY call this in the implementation of the handle_request branch in subclass.
+        Runs under the internal lock, which _process_iteration holds around _handle_all_requests.
         """
-        if token not in self.__internal_requests_queue:
+        dat = self.__internal_requests.get(token, None)
+        if dat is None or token in self.__internal_responses:
             raise ValueError("Cannot accept/reject the same token twice!")
         
-        # remove from queue, and put an error reason
-        self.__internal_requests_queue.remove(token)
-        dat = self.__internal_requests_data.pop(token)
-        self.__internal_responses[token] = ErrorResponse(error_msg=error_reason)
-        self.__internal_responses[token]._set_static_state(dat._static_state)
+        # put an error reason. the request is removed from the queue after _handle_all_requests returns
+        response = ErrorResponse(error_msg=error_reason)
+        response._set_static_state(dat._static_state)
+        self.__internal_responses[token] = response
 
     @abc.abstractmethod
     def initialize(self) -> bool:
@@ -264,7 +273,7 @@ class AbstractSingleThreadExecutor(abc.ABC):
         raise NotImplementedError("Must be implemented by subclasses!")
     
     @abc.abstractmethod
-    def _handle_all_requests(self, all_requests_queue: list[str], all_requests_data: dict[str, AbstractRequest]) -> None:
+    def _handle_all_requests(self, all_requests_queue: Sequence[str], all_requests_data: Mapping[str, AbstractRequest]) -> None:
         """
         Abstract method to handle the processing of all the requests.
         Must be implemented by subclasses, and DO NOT call this externally!
@@ -272,19 +281,18 @@ class AbstractSingleThreadExecutor(abc.ABC):
         will be run in the same thread, and therefore not run at the
         same time to create race conditions.
 
-        Also, the request queue and requests data here are shallow copies of the ones
-        stored internally in the AbstractSingleThreadExecutor class. Therefore, modifying
-        them won't affect the actual status. Use the .accept() and .reject() methods,
-        which tells the executor to accept or reject the queue and data and internally
-        changes the request to the response (or error response). 
+        Also, the requests data here is the one stored internally in the AbstractSingleThreadExecutor
+        class (not copied), so it MUST NOT be modified. Use the .accept() and .reject() methods,
+        which tells the executor to accept or reject the request and internally changes the
+        request to the response (or error response). 
 
-        Since they are shallow copy, it is safe to loop through them even when some .accept()
-        or .reject() are called, since the references are fixed. Modifying the contents of
-        each individual AbstractRequest will indeed be permanent since deep copy isn't used.
+        The accepted and rejected requests are only removed after _handle_all_requests returns,
+        so it is safe to loop through the queue or the data even when some .accept() or .reject()
+        are called. Modifying the contents of each individual AbstractRequest will indeed be permanent.
 
         Args:
-            all_requests_queue (str): The tokens in queue order preserved of all the requests.
-            all_requests_data (dict[str, AbstractRequest]): The requests.
+            all_requests_queue (Sequence[str]): The tokens in queue order preserved of all the requests.
+            all_requests_data (Mapping[str, AbstractRequest]): The requests. Read only.
 
         Throws:
             Exception: CANNOT throw any exception. Implementations must catch all exceptions, and use the
@@ -317,17 +325,15 @@ class AbstractSingleThreadExecutor(abc.ABC):
         """
         with self.__status_lock:
             if not self.running:
-                tmp_lock = threading.Lock()
+                self._init_done = threading.Event() # fresh for each start, so a restart doesn't see the previous initialization
 
                 self.running = True
-                self._thread = threading.Thread(target=executor_thread_runner, args=(self, tmp_lock))
+                self._thread = threading.Thread(target=executor_thread_runner, args=(self, self._init_done))
                 self._thread.start()
                 self.logger.info("Executor thread started.")
 
                 if wait_for_init_complete:
-                    time.sleep(0.1)
-                    tmp_lock.acquire(blocking=True)
-                    tmp_lock.release()
+                    self._init_done.wait()
                     return self.running
         
         return None
@@ -343,6 +349,7 @@ class AbstractSingleThreadExecutor(abc.ABC):
         with self.__status_lock:
             if self.running:
                 self.running = False
+                self.__notify_work()
                 self.logger.info("Stopping executor thread.")
                 if await_thread_stop and self._thread is not None:
                     self._thread.join()
@@ -358,27 +365,25 @@ class AbstractSingleThreadExecutor(abc.ABC):
         Returns:
             Optional[AbstractResponse]: The response if available, else None.
         """
-        with self.__lock_external:
+        # fast path for the common "not ready yet" case: single dict reads are atomic, so no lock is needed to return None
+        if self.__external_responses.get(tok) is None and tok in self.__external_request_response_previous_action:
+            return None
+        
+        with self.__lock_lifecycle:
             if tok not in self.__external_request_response_previous_action:
                 return ErrorResponse("Invalid token! Tokens must be obtained via queue_request!")
+        with self.__lock_responses:
             response = self.__external_responses.pop(tok, None)
-            if response is not None: # If found, remove the token from the lifecycle
-                self.__external_request_response_previous_action.pop(tok)
-            return response
+        if response is not None: # If found, remove the token from the lifecycle
+            with self.__lock_lifecycle:
+                self.__external_request_response_previous_action.pop(tok, None)
+        return response
     
-    def generate_next_token(self):
+    def __mint_token(self) -> str:
         """
-        Generates a unique token for each request. Used internally - do not call this, even for subclasses!
+        Generates an unguessable token (128 random bits) for each request. Can be called in any thread without locking.
         """
-        self.__itoken += 1
-        if self.__strtoken is None:
-            self.__strtoken = hashlib.sha256(self.__itoken.to_bytes(16, byteorder="big", signed=True) + self.__seed).hexdigest()
-        else:
-            ntoken = None
-            while ntoken is None or (ntoken in self.__external_request_response_previous_action):
-                ptoken = self.__strtoken.encode() if (ntoken is None) else ntoken.encode()
-                ntoken = hashlib.sha256(ptoken + self.__itoken.to_bytes(16, byteorder="big", signed=True) + self.__seed).hexdigest()
-            self.__strtoken = ntoken
+        return os.urandom(16).hex() # same as secrets.token_hex(16), without the wrapper
 
     def queue_request(self, x: AbstractRequest) -> str:
         """
@@ -393,34 +398,41 @@ class AbstractSingleThreadExecutor(abc.ABC):
         Raises:
             ValueError: If the handling of requests and responses pool is already full.
         """
-        with self.__lock_external:
+        token = self.__mint_token() # outside the lock, minting has no shared state to protect
+        with self.__lock_lifecycle:
             if len(self.__external_request_response_previous_action) >= self.max_handle_requests_and_responses:
                 raise PoolFullException("Handling of requests/responses already full! Use cleanup_old_responses to cleanup the responses being processed.")
 
-            token = self.__strtoken
-            self.__external_requests_queue.append(token)
-            self.__external_requests_queue_data[token] = x
-            self.__external_request_response_previous_action[token] = time.time()
-            self.generate_next_token()
-            return token
+            while token in self.__external_request_response_previous_action: # practically never happens
+                token = self.__mint_token()
+            self.__external_request_response_previous_action[token] = time.monotonic()
+        self.__external_requests.put_nowait((token, x))
+        self.__notify_work()
+        return token
     
-    def cleanup_old_responses(self, time_override: Optional[float]=None):
+    def cleanup_old_responses(self, time_override: Optional[float]=None, now: Optional[float]=None):
         """
         Handles cleanup of external responses, due to expiration. Can be called in any thread.
 
         Args:
             time_override (Optional[float]): Override the time of being too old, if necessary.
+            now (Optional[float]): The current time.monotonic(), if already known.
         """
         cleanup_time: float = self.old_cleanup_time if time_override is None else time_override
-        with self.__lock_external:
-            ctime = time.time()
-            ext_keys = set(self.__external_responses.keys())
-            for token in ext_keys:
-                prev_time: float = self.__external_request_response_previous_action[token]
-                if (ctime - prev_time) > cleanup_time: # ok, cleanup now
-                    self.logger.debug("Cleaned up token {}".format(token))
-                    self.__external_request_response_previous_action.pop(token)
-                    self.__external_responses.pop(token)
+        with self.__lock_responses, self.__lock_lifecycle:
+            ctime = time.monotonic() if now is None else now
+            expired: list[str] = []
+            for token, prev_time in self.__external_request_response_previous_action.items(): # oldest first, so stop at the first one that isn't expired
+                if (ctime - prev_time) <= cleanup_time:
+                    break
+                if token in self.__external_responses: # requests without a response yet are never cleaned up
+                    expired.append(token)
+            for token in expired: # ok, cleanup now
+                self.__external_request_response_previous_action.pop(token)
+                self.__external_responses.pop(token)
+        if expired and self.logger.isEnabledFor(logging.DEBUG): # log outside the locks
+            for token in expired:
+                self.logger.debug("Cleaned up token %s", token)
 
     def is_running(self) -> bool:
         """
@@ -429,8 +441,7 @@ class AbstractSingleThreadExecutor(abc.ABC):
         Returns:
             bool: True if running, False otherwise.
         """
-        with self.__status_lock:
-            return self.running
+        return self.running # reading a bool attribute is atomic, the lock only serializes start and stop
 
     def cancel_request(self, tok: str) -> None:
         """
@@ -439,34 +450,67 @@ class AbstractSingleThreadExecutor(abc.ABC):
         Args:
             tok (str): The token of the request to cancel.
         """
-        with self.__lock_external:
+        with self.__lock_cancel:
             self.__external_requests_to_cancel.append(tok)
+        self.__notify_work()
+
+    def discard_request(self, tok: str) -> None:
+        """
+        Cancels a request and frees its token immediately, instead of when the response is polled or expires.
+        Only for tokens that will never be polled (e.g. never returned to the caller). Can be called in any thread.
 
-def executor_thread_runner(executor: AbstractSingleThreadExecutor, init_complete_lock: threading.Lock):
+        Args:
+            tok (str): The token of the request to discard.
+        """
+        with self.__lock_responses, self.__lock_lifecycle:
+            if self.__external_request_response_previous_action.pop(tok, None) is None: # invalid, or already freed
+                return
+            if self.__external_responses.pop(tok, None) is not None: # already published, nothing left to cancel
+                return
+            self.__discarded.add(tok)
+        self.cancel_request(tok)
+
+    def __notify_work(self) -> None:
+        """
+        Wakes up the executor thread, if it is waiting for the next iteration. Used internally - do not call this, even for subclasses!
+        """
+        with self._wake:
+            self._wake_pending = True
+            self._wake.notify()
+
+def executor_thread_runner(executor: AbstractSingleThreadExecutor, init_done: threading.Event):
     """
     The main loop that runs in the executor thread.
     It initializes the executor, then continuously processes requests until stopped.
     """
     try:
         success: bool = False
-        with init_complete_lock:
+        try:
             success = executor.initialize()
-        if not success:
-            executor.running = False
+        finally:
+            if not success:
+                executor.running = False
+            init_done.set() # also if initialize() raised, so that start() doesn't wait forever
         while executor.running:
-            start_time = time.time()
+            start_time = time.monotonic()
             try:
-                executor._process_iteration()
+                executor._process_iteration(start_time)
             except Exception as e:
-                executor.logger.error(f"Error during executor iteration: {e}")
-                executor.logger.error(traceback.format_exc())
-            elapsed = time.time() - start_time
-            sleep_time = max(executor.loop_sleep - elapsed, 0)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+                executor.logger.error("Error during executor iteration: %s", e, exc_info=True)
+            deadline = executor._next_iteration_deadline(start_time)
+            with executor._wake: # sleep until the next iteration, or until there is new work
+                if not executor._wake_pending:
+                    if deadline is None: # idle, nothing to do until notified
+                        executor._wake.wait()
+                    else:
+                        sleep_time = deadline - time.monotonic()
+                        if sleep_time > 0:
+                            executor._wake.wait(timeout=sleep_time)
+                executor._wake_pending = False
     finally:
         try:
             executor.shutdown()
         except Exception as e:
-            executor.logger.error(f"Error during executor shutdown: {e}")
-            executor.logger.debug(traceback.format_exc())
\ No newline at end of file
+            executor.logger.error("Error during executor shutdown: %s", e)
+            if executor.logger.isEnabledFor(logging.DEBUG):
+                executor.logger.debug(traceback.format_exc())
\ No newline at end of file
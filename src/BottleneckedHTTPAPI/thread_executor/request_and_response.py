@@ -1,10 +1,13 @@
 import abc
+import enum
 from typing import Optional, Any
 
 class AbstractRequest(abc.ABC):
     """
     Abstract base class representing a request to be processed by the executor.
+    Subclasses can define their own __slots__ to avoid the per-instance __dict__.
     """
+    __slots__ = ("_static_state",)
     _static_state: Optional[Any]
 
     def __init__(self, static_state: Optional[Any]=None):
@@ -21,12 +24,22 @@ class AbstractRequest(abc.ABC):
         """
         self._static_state = static_state
     
+class ResponseStatus(enum.IntEnum):
+    """
+    The outcome of a request, stored in AbstractResponse.status.
+    """
+    OK = 0
+    ERROR = 1
+    CANCELLED = 2
+
 class AbstractResponse:
     """
     Class representing a response from the executor after processing a request.
+    Subclasses can define their own __slots__ to avoid the per-instance __dict__.
     """
-    cancelled: bool
-    error_msg: Optional[str]
+    __slots__ = ("status", "_error_msg", "_static_state")
+    status: ResponseStatus # kept in sync by the error_msg and cancelled setters, so the checks below are a single field read
+    _error_msg: Optional[str]
     _static_state: Optional[Any]
     
     def __init__(
@@ -34,15 +47,42 @@ class AbstractResponse:
         cancelled: bool = False,
         error_msg: Optional[str] = None
     ):
-        self.cancelled = cancelled
-        self.error_msg = error_msg
+        self.status = ResponseStatus.CANCELLED if cancelled else (ResponseStatus.OK if error_msg is None else ResponseStatus.ERROR)
+        self._error_msg = error_msg
         self._static_state = None
 
+    @property
+    def error_msg(self) -> Optional[str]:
+        """
+        The error message, or None. Can be assigned directly (same as errorify), the status follows.
+        """
+        return self._error_msg
+
+    @error_msg.setter
+    def error_msg(self, error_msg: Optional[str]) -> None:
+        self._error_msg = error_msg
+        if getattr(self, "status", ResponseStatus.OK) is not ResponseStatus.CANCELLED: # status is unset if a subclass skipped __init__
+            self.status = ResponseStatus.OK if error_msg is None else ResponseStatus.ERROR
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Whether the response is due to cancellation. Same as is_cancelled(). Can be assigned, the status follows.
+        """
+        return getattr(self, "status", ResponseStatus.OK) is ResponseStatus.CANCELLED
+
+    @cancelled.setter
+    def cancelled(self, cancelled: bool) -> None:
+        if cancelled:
+            self.status = ResponseStatus.CANCELLED
+        elif self.cancelled:
+            self.status = ResponseStatus.OK if getattr(self, "_error_msg", None) is None else ResponseStatus.ERROR
+
     def has_error(self) -> bool:
         """
         Whether there is an error. Can be freely used.
         """
-        return self.error_msg is not None
+        return self._error_msg is not None
     
     def get_error_msg(self):
         """
@@ -50,13 +90,13 @@ class AbstractResponse:
         """
         if not self.has_error():
             raise ValueError("Only works when there is an error!")
-        return self.error_msg
+        return self._error_msg
     
     def is_cancelled(self) -> bool:
         """
         Whether the error is due to cancellation. Can be freely used.
         """
-        return self.cancelled
+        return self.status is ResponseStatus.CANCELLED
     
     def errorify(self, error_msg: str) -> None:
         """
@@ -69,7 +109,7 @@ class AbstractResponse:
         """
         Is the response successful (Equivalent to not has_error). Can be freely used.
         """
-        return not (self.has_error() or self.is_cancelled())
+        return self.status is ResponseStatus.OK
 
     def _set_static_state(self, static_state: Optional[Any]) -> None:
         """
@@ -84,16 +124,27 @@ class AbstractResponse:
         """
         return self._static_state
 
+_CANCELLED_MSG = "Response is cancelled!"
+
 class ErrorResponse(AbstractResponse):
     """
     Class representing an error response.
     """
+    __slots__ = ()
+
     def __init__(self, error_msg: str):
-        super().__init__(False, error_msg)
+        self.status = ResponseStatus.ERROR
+        self._error_msg = error_msg
+        self._static_state = None
     
 class CancelledResponse(AbstractResponse):
     """
     Class representing a cancelled response.
     """
+    __slots__ = ()
+
     def __init__(self):
-        super().__init__(True, "Response is cancelled!")
\ No newline at end of file
+        # all cancelled responses are the same, so set the fields directly instead of going through AbstractResponse.__init__
+        self.status = ResponseStatus.CANCELLED
+        self._error_msg = _CANCELLED_MSG
+        self._static_state = None
\ No newline at end of file
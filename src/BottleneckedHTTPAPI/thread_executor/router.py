@@ -1,5 +1,5 @@
 from typing import Union, Any, Callable, Optional
-import hashlib
+import sys
 
 from .abstract_executor import AbstractSingleThreadExecutor, PoolFullException
 from .request_and_response import AbstractRequest, AbstractResponse, ErrorResponse
@@ -10,13 +10,16 @@ class SingleThreadExecutorRouterWrapper:
     requests and responses in different threads. Allows registering callbacks
     for different functions to handle the execution.
     """
-    registered_processors: dict[tuple[Union[str, int, float]], tuple[Callable[[Any], tuple[AbstractRequest, Any]], Callable[[AbstractResponse, Any], None]]]
+    __slots__ = ("registered_processors", "_registered_single", "_exec_hash_to_exec",
+                 "_exec_to_exec_hash", "_hashlen", "_executor_pool", "_is_single", "_rp_length")
+    registered_processors: dict[tuple[Union[str, int, float]], tuple[Callable[[Any], tuple[AbstractRequest, Any]], Callable[[AbstractResponse, Any], None], AbstractSingleThreadExecutor, str]] # (preprocess, postprocess, executor, token prefix)
+    _registered_single: dict[Union[str, int, float], tuple[Callable[[Any], tuple[AbstractRequest, Any]], Callable[[AbstractResponse, Any], None], AbstractSingleThreadExecutor, str]] # same entries keyed by the only element, when the values have length 1
 
-    _registered_processors_to_exec: dict[tuple[Union[str, int, float]], str] # optional
-    _exec_hash_to_exec: dict[str, str] # optional
+    _exec_hash_to_exec: dict[str, AbstractSingleThreadExecutor] # optional. token prefix -> executor
     _exec_to_exec_hash: dict[str, str] # optional
     _hashlen: int # optional
     _executor_pool: Union[AbstractSingleThreadExecutor, dict[str, AbstractSingleThreadExecutor]]
+    _is_single: bool # the pool cannot change after construction, so is_single_executor() is computed once
     _rp_length: int
 
     def __init__(self,
@@ -34,33 +37,32 @@ class SingleThreadExecutorRouterWrapper:
             if not all(isinstance(executor_pool[k], AbstractSingleThreadExecutor) for k in executor_pool):
                 raise ValueError("For multiple execution, expect a dictionary of str-AbstractSingleThreadExecutor pairs!")
             
-            # populate the hash maps
+            if len(executor_pool) > 0x10000:
+                raise ValueError("At most 65536 executors are supported!")
+
+            # populate the prefix maps. the prefix only has to be unique (not secret), so a fixed width counter is enough
             self._exec_hash_to_exec = {}
             self._exec_to_exec_hash = {}
-            self._hashlen = None
-            for k in executor_pool:
-                khash = hashlib.sha256(k).hexdigest()
-                if self._hashlen is not None and len(khash) != self._hashlen:
-                    raise ValueError("incorrect hash")
-                self._hashlen = len(khash)
-                if khash in self._exec_hash_to_exec:
-                    raise ValueError("wtf improbable hash collision")
-                self._exec_hash_to_exec[khash] = k
+            self._hashlen = 4
+            for i, k in enumerate(executor_pool):
+                khash = format(i, "04x")
+                self._exec_hash_to_exec[khash] = executor_pool[k]
                 self._exec_to_exec_hash[k] = khash
         else:
             self._exec_hash_to_exec = {}
             self._exec_to_exec_hash = {}
             
         self._executor_pool = executor_pool
+        self._is_single = isinstance(executor_pool, AbstractSingleThreadExecutor)
         self._rp_length = None
         self.registered_processors = {}
-        self._registered_processors_to_exec = {}
+        self._registered_single = {}
     
     def is_single_executor(self) -> bool:
         """
         Returns whether a single executor is used.
         """
-        return isinstance(self._executor_pool, AbstractSingleThreadExecutor)
+        return self._is_single
 
     def register_processor_pair(
         self,
@@ -106,21 +108,95 @@ class SingleThreadExecutorRouterWrapper:
             raise ValueError("The value must be a list of str int float.")
         if value in self.registered_processors:
             raise ValueError("Cannot have repeated values.")
-        if not self.is_single_executor():
+        chosen_exec: AbstractSingleThreadExecutor
+        prefix: str
+        if not self._is_single:
             if executor_tag is None or not isinstance(executor_tag, str):
                 raise ValueError("When using executor pool mode, the executor tag must be given to specify which to use!")
             if executor_tag not in self._executor_pool:
                 raise ValueError("Invalid executor tag! Must be a key of executor_pool.")
-            self._registered_processors_to_exec[value] = executor_tag
+            chosen_exec = self._executor_pool[executor_tag]
+            prefix = self._exec_to_exec_hash[executor_tag]
+        else:
+            chosen_exec = self._executor_pool
+            prefix = ""
         
+        # intern the strings, so that lookups with equal (e.g. interned literal) strings compare by identity first
+        value = tuple(sys.intern(v) if type(v) is str else v for v in value)
         self._rp_length = len(value)
-        self.registered_processors[value] = (preprocess_callback, postprocess_callback)
+        entry = (preprocess_callback, postprocess_callback, chosen_exec, prefix) # resolved once, so queueing needs a single lookup
+        self.registered_processors[value] = entry
+        if len(value) == 1:
+            self._registered_single[value[0]] = entry
     
+    def __lookup(self, value: Union[list[Union[str, int, float]], tuple[Union[str, int, float]]]) -> Optional[tuple[Callable[[Any], tuple[AbstractRequest, Any]], Callable[[AbstractResponse, Any], None], AbstractSingleThreadExecutor, str]]:
+        """The entry (processors, executor, token prefix) for the value given as a list or tuple, or None."""
+        try:
+            if self._rp_length == 1: # no tuple needs to be built
+                return self._registered_single.get(value[0], None) if len(value) == 1 else None
+            return self.registered_processors.get(value if type(value) is tuple else tuple(value), None)
+        except TypeError: # unhashable elements, cannot be registered
+            return None
+
+    def __check_value(self, value: tuple[Union[str, int, float]]) -> None:
+        """Raises ValueError if the value cannot be a registered value. Only used when the value is not found, to report the reason."""
+        if (len(value) == 0) or (self._rp_length is not None and len(value) != self._rp_length):
+            raise ValueError("Length must match the prior lengths!")
+        if not all(isinstance(v, (str, int, float)) for v in value):
+            raise ValueError("The value must be a list of str int float.")
+
     def has_value(self, value: Union[list[Union[str, int, float]], tuple[Union[str, int, float]]]) -> bool:
         """Whether a value is validly contained as one of the criterion for the pre/postprocessing pair."""
-        if isinstance(value, list):
+        value_type = type(value)
+        if value_type is not tuple and value_type is not list and not isinstance(value, (list, tuple)):
+            return False
+        return self.__lookup(value) is not None # no tuple is built for tuples, or for length 1 values
+
+    def __prepare_and_enqueue(
+        self,
+        value: Union[list[Union[str, int, float]], tuple[Union[str, int, float]]],
+        request_kwargs: dict[str, Any]
+    ) -> tuple[Optional[str], Optional[tuple[str, BaseException]]]:
+        """
+        The shared implementation of queue_request and queue_request_suppress_exc. Preprocesses and queues the request.
+
+        Returns:
+            Optional[str]: The token assigned to the request, or None if there is an error.
+            Optional[tuple[str, BaseException]]: The error message for queue_request_suppress_exc and the exception for queue_request, or None if successful.
+        
+        Raises:
+            ValueError: If the value is not a valid value (both variants raise it).
+        """
+        value_type = type(value)
+        if value_type is not tuple and value_type is not list and not isinstance(value, (list, tuple)): # exact types are pointer compares, subclasses fall back to isinstance
+            raise ValueError("Value must be a list or tuple!")
+        processors = self.__lookup(value)
+        if processors is None:
             value = tuple(value)
-        return value in self.registered_processors
+            self.__check_value(value) # only validate when not found, the registered values are valid by construction
+            return None, ("Not Implemented Yet.", NotImplementedError("Value {} not found! Must register it in register_processor_pair".format(value)))
+        
+        # unpack once, instead of indexing the entry as needed
+        preprocess_fn: Callable[[Any], tuple[AbstractRequest, Any]]
+        postprocess_fn: Callable[[AbstractResponse, Any], None]
+        chosen_exec: AbstractSingleThreadExecutor
+        prefix: str
+        preprocess_fn, postprocess_fn, chosen_exec, prefix = processors
+
+        request: AbstractRequest
+        static_state: Any
+        try:
+            request, static_state = preprocess_fn(**request_kwargs)
+        except BaseException as e:
+            return None, ("Internal error when preprocessing the request.", e)
+        request._static_state = (static_state, postprocess_fn) # carried to the response, so poll_response needs no lookup
+
+        # list executors
+        try:
+            pretok = chosen_exec.queue_request(request)
+        except PoolFullException as e:
+            return None, ("The execution pool is full. Please wait.", e)
+        return (prefix + pretok if prefix else pretok), None # concatenate as the token
 
     def queue_request(
         self,
@@ -142,32 +218,10 @@ class SingleThreadExecutorRouterWrapper:
             NotImplementedError: If the value doesn't exist (criterion not registered by register_processor_pair).
             BaseException: Any exception that can raised by the selected preprocess_callback. The internal state of the executor will still be intact if this happens.
         """
-        if not (isinstance(value, list) or isinstance(value, tuple)):
-            raise ValueError("Value must be a list or tuple!")
-        if isinstance(value, list):
-            value = tuple(value)
-        if (len(value) == 0) or (self._rp_length is not None and len(value) != self._rp_length):
-            raise ValueError("Length must match the prior lengths!")
-        if not all(isinstance(v, (str, int, float)) for v in value):
-            raise ValueError("The value must be a list of str int float.")
-        if value not in self.registered_processors:
-            raise NotImplementedError("Value {} not found! Must register it in register_processor_pair".format(value))
-        
-        preprocess_fn: Callable[[Any], tuple[AbstractRequest, Any]] = self.registered_processors[value][0]
-
-        request: AbstractRequest
-        static_state: Any
-        request, static_state = preprocess_fn(**request_kwargs)
-        request._static_state = {"static_state": static_state, "vtuple": value}
-
-        # list executors
-        if self.is_single_executor():
-            return self._executor_pool.queue_request(request)
-        else:
-            chosen_exec: AbstractSingleThreadExecutor = self._executor_pool[self._registered_processors_to_exec[value]]
-            typehash: str = self._exec_to_exec_hash[self._registered_processors_to_exec[value]]
-            pretok = chosen_exec.queue_request(request)
-            return typehash + pretok # concatenate as the token
+        token, err = self.__prepare_and_enqueue(value, request_kwargs)
+        if err is not None:
+            raise err[1]
+        return token
 
     
     def queue_request_suppress_exc(
@@ -188,40 +242,55 @@ class SingleThreadExecutorRouterWrapper:
             str: The token assigned to the request, or the error message.
             bool: Whether it was successful or an error.
         """
-        if not (isinstance(value, list) or isinstance(value, tuple)):
-            raise ValueError("Value must be a list or tuple!")
-        if isinstance(value, list):
-            value = tuple(value)
-        if (len(value) == 0) or (self._rp_length is not None and len(value) != self._rp_length):
-            raise ValueError("Length must match the prior lengths!")
-        if not all(isinstance(v, (str, int, float)) for v in value):
-            raise ValueError("The value must be a list of str int float.")
-        if value not in self.registered_processors:
-            return "Not Implemented Yet.", False
-        
-        preprocess_fn: Callable[[Any], tuple[AbstractRequest, Any]] = self.registered_processors[value][0]
+        token, err = self.__prepare_and_enqueue(value, request_kwargs)
+        if err is not None:
+            return err[0], False
+        return token, True
+    
+    def queue_requests(
+        self,
+        items: list[tuple[Union[list[Union[str, int, float]], tuple[Union[str, int, float]]], dict[str, Any]]]
+    ) -> list[str]:
+        """
+        Queues several requests for execution, same as calling queue_request for each of them.
+        If one of them fails, the requests of the batch that were already queued are discarded (cancelled, and removed
+        from the pool immediately since their tokens are never returned), and the exception is raised.
 
-        request: AbstractRequest
-        static_state: Any
-        try:
-            request, static_state = preprocess_fn(**request_kwargs)
-        except BaseException:
-            return "Internal error when preprocessing the request.", False
-        request._static_state = {"static_state": static_state, "vtuple": value}
+        Args:
+            items: The (value, request_kwargs) pairs, see queue_request.
 
-        # list executors
+        Returns:
+            list[str]: The tokens assigned to the requests, in the same order.
+        
+        Raises:
+            The same exceptions as queue_request.
+        """
+        prepare_and_enqueue = self.__prepare_and_enqueue
+        tokens: list[str] = []
         try:
-            if self.is_single_executor():
-                resp = self._executor_pool.queue_request(request)
-            else:
-                chosen_exec: AbstractSingleThreadExecutor = self._executor_pool[self._registered_processors_to_exec[value]]
-                typehash: str = self._exec_to_exec_hash[self._registered_processors_to_exec[value]]
-                pretok = chosen_exec.queue_request(request)
-                resp = typehash + pretok # concatenate as the token
-        except PoolFullException:
-            return "The execution pool is full. Please wait.", False
-        return resp, True
+            for value, request_kwargs in items:
+                token, err = prepare_and_enqueue(value, request_kwargs)
+                if err is not None:
+                    raise err[1]
+                tokens.append(token)
+        except BaseException:
+            for token in tokens:
+                executor, token = self.__split_token(token)
+                executor.discard_request(token) # the tokens are valid, they were just minted
+            raise
+        return tokens
     
+    def __split_token(self, token: str) -> tuple[Optional[AbstractSingleThreadExecutor], str]:
+        """
+        Splits a token given by queue_request into the executor and the token of the executor.
+        The executor is None if the token has an invalid format. O(1), one slice and one dict lookup regardless of the pool size.
+        """
+        if self._is_single:
+            return self._executor_pool, token
+        hashlen = self._hashlen
+        # all the prefixes have the same width, so a token that is too short gives a shorter slice, which simply isn't found
+        return self._exec_hash_to_exec.get(token[:hashlen], None), token[hashlen:]
+
     def poll_response(self, token: str) -> Optional[AbstractResponse]:
         """
         Retrieves the response for a given token if available. If the response doesn't
@@ -240,18 +309,10 @@ class SingleThreadExecutorRouterWrapper:
             Should not raise any error or exceptions, unless there's a bug in the implementation
             of the postprocess_callback, or a bug in the Router / Executor itself.
         """
-        executor: AbstractSingleThreadExecutor
-        token: str
-        if self.is_single_executor():
-            executor = self._executor_pool
-        else:
-            if self._hashlen >= token:
-                return ErrorResponse(token, "Invalid token format.")
-            exec_hash = token[:self._hashlen]
-            token = token[self._hashlen:]
-            if exec_hash not in self._exec_hash_to_exec:
-                return ErrorResponse(token, "Invalid token format.")
-            executor = self._executor_pool[self._exec_hash_to_exec[exec_hash]]
+        executor: Optional[AbstractSingleThreadExecutor]
+        executor, token = self.__split_token(token)
+        if executor is None:
+            return ErrorResponse("Invalid token format.")
         response: Optional[AbstractResponse] = executor.poll_response(token)
         if response is None:
             return None
@@ -261,10 +322,8 @@ class SingleThreadExecutorRouterWrapper:
         
         # format now
         static_state: Any
-        value: list[Union[str, int, float]]
-        static_state = response._static_state["static_state"]
-        value = response._static_state["vtuple"]
-        postprocess_fn: Callable[[AbstractResponse, Any], None] = self.registered_processors[value][1]
+        postprocess_fn: Callable[[AbstractResponse, Any], None]
+        static_state, postprocess_fn = response._static_state
         postprocess_fn(response, static_state)
 
         # return
@@ -277,16 +336,9 @@ class SingleThreadExecutorRouterWrapper:
         Args:
             token (str): The token to cancel.
         """
-        executor: AbstractSingleThreadExecutor
-        if self.is_single_executor():
-            executor = self._executor_pool
-        else:
-            if self._hashlen >= token:
-                return
-            exec_hash = token[:self._hashlen]
-            token = token[self._hashlen:]
-            if exec_hash not in self._exec_hash_to_exec:
-                return
-            executor = self._executor_pool[self._exec_hash_to_exec[exec_hash]]
+        executor: Optional[AbstractSingleThreadExecutor]
+        executor, token = self.__split_token(token)
+        if executor is None:
+            return
         
         executor.cancel_request(token)
\ No newline at end of file
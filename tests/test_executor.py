@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+import unittest
+
+from BottleneckedHTTPAPI.thread_executor import AbstractRequest, AbstractResponse, AbstractSingleThreadExecutor, PoolFullException
+
+class _Request(AbstractRequest):
+    __slots__ = ("hold", "reject")
+
+    def __init__(self, hold: bool = False, reject: bool = False):
+        super().__init__()
+        self.hold = hold
+        self.reject = reject
+
+class _Executor(AbstractSingleThreadExecutor):
+    """Accepts (or rejects) every request, except the held ones."""
+    def __init__(self, **kwargs):
+        super().__init__(logging.getLogger("test_executor"), **kwargs)
+        self.cancelled: list[str] = []
+        self.seen: list[tuple[str, ...]] = [] # the queue given to each _handle_all_requests
+
+    def initialize(self) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+    def _handle_request_cancel(self, token, request) -> None:
+        self.cancelled.append(token)
+
+    def _handle_all_requests(self, all_requests_queue, all_requests_data) -> None:
+        self.seen.append(tuple(all_requests_queue))
+        for token in all_requests_queue:
+            request = all_requests_data[token]
+            if request.reject:
+                self.reject(token, "rejected")
+            elif not request.hold:
+                self.accept(token, AbstractResponse())
+
+def _lifecycle(executor: AbstractSingleThreadExecutor):
+    return executor._AbstractSingleThreadExecutor__external_request_response_previous_action
+
+class TestLifecycle(unittest.TestCase):
+    def test_times_stay_ordered(self):
+        # the iterations are run in this thread, without starting the executor
+        executor = _Executor()
+        done = executor.queue_request(_Request())
+        held = executor.queue_request(_Request(hold=True))
+        executor._process_iteration(now=time.monotonic() - 100.0) # an iteration that started before the requests were queued
+        times = list(_lifecycle(executor).values())
+        self.assertEqual(list(_lifecycle(executor)), [held, done])
+        self.assertEqual(times, sorted(times))
+
+        # the response is only expired once it is old enough, even though the iteration started earlier
+        executor.cleanup_old_responses(time_override=50.0)
+        self.assertIsNotNone(executor.poll_response(done))
+
+class TestIteration(unittest.TestCase):
+    def test_accept_and_reject(self):
+        executor = _Executor()
+        held = executor.queue_request(_Request(hold=True))
+        accepted = executor.queue_request(_Request())
+        rejected = executor.queue_request(_Request(reject=True))
+        self.assertIsNone(executor.poll_response(accepted)) # not handled yet
+        executor._process_iteration()
+        self.assertEqual(executor.seen, [(held, accepted, rejected)]) # in queue order
+        self.assertTrue(executor.poll_response(accepted).is_successful_response())
+        response = executor.poll_response(rejected)
+        self.assertEqual((response.has_error(), response.get_error_msg()), (True, "rejected"))
+
+        # the accepted and rejected requests are removed after the iteration, the held one is handled again
+        executor._process_iteration()
+        self.assertEqual(executor.seen[1], (held,))
+        self.assertIsNone(executor.poll_response(held))
+
+    def test_accept_twice(self):
+        executor = _Executor()
+        token = executor.queue_request(_Request())
+        executor._process_iteration()
+        with self.assertRaises(ValueError):
+            executor.accept(token, AbstractResponse())
+
+class TestQueue(unittest.TestCase):
+    def test_queued_from_several_threads(self):
+        executor = _Executor(max_handle_requests_and_responses=200)
+        tokens: dict[int, list[str]] = {}
+        def queue(i: int):
+            tokens[i] = [executor.queue_request(_Request(hold=True)) for _ in range(50)]
+        threads = [threading.Thread(target=queue, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with self.assertRaises(PoolFullException):
+            executor.queue_request(_Request())
+
+        executor._process_iteration()
+        seen = executor.seen[0]
+        self.assertEqual(sorted(seen), sorted(t for ts in tokens.values() for t in ts)) # every request, once
+        for ts in tokens.values(): # FIFO, for the requests of each thread
+            self.assertEqual([t for t in seen if t in ts], ts)
+
+class TestCancellation(unittest.TestCase):
+    def test_cancel_queued(self):
+        # cancelled before the executor moved it, the implementation never sees the request
+        executor = _Executor()
+        token = executor.queue_request(_Request(hold=True))
+        executor.cancel_request(token)
+        executor._process_iteration()
+        self.assertEqual(executor.seen, [()])
+        self.assertEqual(executor.cancelled, [])
+        self.assertTrue(executor.poll_response(token).is_cancelled())
+
+    def test_cancel_handled(self):
+        executor = _Executor()
+        token = executor.queue_request(_Request(hold=True))
+        executor._process_iteration()
+        executor.cancel_request(token)
+        executor._process_iteration()
+        self.assertEqual(executor.seen, [(token,), ()])
+        self.assertEqual(executor.cancelled, [token]) # the implementation cleans up the request
+        response = executor.poll_response(token)
+        self.assertTrue(response.is_cancelled() and response.has_error())
+
+    def test_cancel_finished_or_invalid(self):
+        executor = _Executor()
+        token = executor.queue_request(_Request())
+        executor._process_iteration()
+        executor.cancel_request(token)
+        executor.cancel_request("0" * 32)
+        executor._process_iteration()
+        self.assertEqual(executor.cancelled, [])
+        self.assertTrue(executor.poll_response(token).is_successful_response()) # the response isn't replaced
+
+def _wait_response(executor: AbstractSingleThreadExecutor, token: str, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = executor.poll_response(token)
+        if response is not None:
+            return response
+        time.sleep(0.005)
+    return None
+
+class TestWakeup(unittest.TestCase):
+    def setUp(self):
+        # loop_sleep is much longer than the test timeouts, so only the notifications can wake up the thread in time
+        self.executor = _Executor(loop_sleep=30.0)
+        self.assertTrue(self.executor.start())
+
+    def tearDown(self):
+        self.executor.stop()
+
+    def test_woken_up_by_queue_and_cancel(self):
+        response = _wait_response(self.executor, self.executor.queue_request(_Request()))
+        self.assertTrue(response is not None and response.is_successful_response())
+
+        token = self.executor.queue_request(_Request(hold=True))
+        time.sleep(0.05)
+        self.executor.cancel_request(token)
+        response = _wait_response(self.executor, token)
+        self.assertTrue(response is not None and response.is_cancelled())
+
+    def test_idle(self):
+        response = _wait_response(self.executor, self.executor.queue_request(_Request()))
+        self.assertIsNotNone(response)
+        time.sleep(0.05)
+        iterations = self.executor.internal_iter_count
+        time.sleep(0.2) # nothing queued, and no responses left to expire
+        self.assertEqual(self.executor.internal_iter_count, iterations)
+        self.assertIsNone(self.executor._next_iteration_deadline(time.monotonic()))
+
+    def test_stop_wakes_up(self):
+        start = time.monotonic()
+        self.executor.stop()
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertFalse(self.executor._thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
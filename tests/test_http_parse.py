@@ -0,0 +1,70 @@
+import socket
+import threading
+import unittest
+
+from BottleneckedHTTPAPI.http_server import http_parse
+
+_BUFFER_SIZE = 64 * 1024 # same as the receive buffer of the ThreadedHTTPServer workers
+
+class TestParseHttpRequest(unittest.TestCase):
+    def setUp(self):
+        self.buf = memoryview(bytearray(_BUFFER_SIZE))
+
+    def __parse(self, chunks: list[bytes], buf=None) -> http_parse.HttpRequest:
+        server, client = socket.socketpair()
+        def send():
+            for chunk in chunks:
+                client.sendall(chunk)
+            client.shutdown(socket.SHUT_WR) # end of the request, as if the client closed the connection
+        thread = threading.Thread(target=send)
+        thread.start()
+        try:
+            server.settimeout(5.0)
+            return http_parse.parse_http_request(server, 1024, 10**9, buf=buf)
+        finally:
+            thread.join()
+            client.close()
+            server.close()
+
+    def __assert_parsed(self, chunks: list[bytes], path: str, body: bytes) -> None:
+        for buf in (self.buf, None): # the reusable buffer gives the same result as the allocated buffers
+            request = self.__parse(chunks, buf)
+            self.assertFalse(request.has_error(), request.error_msg())
+            self.assertEqual(request.get_path(), path)
+            self.assertEqual(request.get_path_bytes(), path.encode())
+            self.assertEqual(request.get_body(), body)
+            self.assertIsInstance(request.get_body(), bytes) # not a view of the reused buffer
+
+    def test_small_request(self):
+        self.__assert_parsed([b"POST /a HTTP/1.1\r\nContent-Length: 5\r\n\r\nhello"], "/a", b"hello")
+
+    def test_split_terminator(self):
+        self.__assert_parsed([b"POST /a HTTP/1.1\r\nContent-Length: 5\r\n\r", b"\nhel", b"lo"], "/a", b"hello")
+
+    def test_body_larger_than_buffer(self):
+        body = bytes(range(256)) * 400
+        head = b"POST /a HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body)
+        self.__assert_parsed([head + body[:30000], body[30000:]], "/a", body)
+
+    def test_head_larger_than_buffer(self):
+        self.__assert_parsed([b"GET /b HTTP/1.1\r\nX: " + b"y" * 70000 + b"\r\n\r\n"], "/b", b"")
+
+    def test_exact_fit(self):
+        head = b"POST /a HTTP/1.1\r\nContent-Length: %d\r\n\r\n"
+        length = _BUFFER_SIZE - len(head % 65000)
+        self.__assert_parsed([head % length + b"z" * length], "/a", b"z" * length)
+
+    def test_buffer_reused(self):
+        self.__parse([b"POST /a HTTP/1.1\r\nContent-Length: 3\r\n\r\nabc"], self.buf)
+        request = self.__parse([b"GET /b HTTP/1.1\r\n\r\n"], self.buf)
+        self.assertEqual((request.get_path(), request.get_body()), ("/b", b"")) # no leftovers of the previous request
+
+    def test_errors(self):
+        self.assertIsNone(self.__parse([], self.buf)) # closed before sending anything
+        request = self.__parse([b"POST /a HTTP/1.1\r\nContent-Length: 10\r\n\r\nabc"], self.buf)
+        self.assertEqual(request.error_msg(), "Connection closed by client while reading the body.")
+        request = self.__parse([b"GET /a HTTP/1.0\r\n\r\n"], self.buf)
+        self.assertTrue(request.has_error())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import socket
+import tempfile
+import threading
+import unittest
+
+from BottleneckedHTTPAPI.http_server import http_write
+
+class _PartialSocket:
+    """Accepts at most limit bytes per sendmsg call, like a socket with a full send buffer."""
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+        self.calls = 0
+
+    def sendmsg(self, buffers) -> int:
+        self.calls += 1
+        sent = 0
+        for buffer in buffers:
+            n = min(len(buffer), self.limit - sent)
+            self.data += buffer[:n]
+            sent += n
+            if sent == self.limit:
+                break
+        return sent
+
+def _read_all(sock: socket.socket) -> bytes:
+    data = b""
+    while chunk := sock.recv(65536):
+        data += chunk
+    return data
+
+class TestSendmsgAll(unittest.TestCase):
+    def test_partial_sends(self):
+        buffers = [b"head", b"", b"0123456789", b"xy"]
+        for limit in (1, 3, 4, 5, 14, 100):
+            sock = _PartialSocket(limit)
+            http_write._sendmsg_all(sock, buffers)
+            self.assertEqual(bytes(sock.data), b"".join(buffers), limit)
+            self.assertEqual(sock.calls, -(-16 // limit), limit) # every call sends as much as possible
+
+    def test_nothing_to_send(self):
+        sock = _PartialSocket(1)
+        http_write._sendmsg_all(sock, [b"", b""])
+        self.assertEqual(sock.calls, 0)
+
+class TestSendResponse(unittest.TestCase):
+    def setUp(self):
+        self.server, self.client = socket.socketpair()
+        self.client.settimeout(5.0)
+
+    def tearDown(self):
+        self.server.close()
+        self.client.close()
+
+    def __send(self, send) -> bytes:
+        # the body is larger than the socket buffers, so the sends are partial until the client reads
+        def run():
+            try:
+                send()
+            finally:
+                self.server.close()
+        thread = threading.Thread(target=run)
+        thread.start()
+        data = _read_all(self.client)
+        thread.join()
+        return data
+
+    def test_send_http_response(self):
+        body = bytes(range(256)) * 4096
+        data = self.__send(lambda: http_write.send_http_response(self.server, 200, {"Content-Type": "a/b"}, body))
+        head, received = data.split(b"\r\n\r\n", 1)
+        self.assertTrue(head.startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertIn(b"Content-Length: %d" % len(body), head)
+        self.assertEqual(received, body)
+
+    def test_send_http_file_response(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b"skip" + b"z" * 300000)
+            f.seek(4)
+            data = self.__send(lambda: http_write.send_http_file_response(self.server, 200, {}, f))
+        head, received = data.split(b"\r\n\r\n", 1)
+        self.assertIn(b"Content-Length: 300000", head)
+        self.assertEqual(received, b"z" * 300000)
+
+if __name__ == "__main__":
+    unittest.main()
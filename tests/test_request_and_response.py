@@ -0,0 +1,32 @@
+import unittest
+
+from BottleneckedHTTPAPI.thread_executor import AbstractResponse, CancelledResponse, ErrorResponse, ResponseStatus
+
+class TestResponseStatus(unittest.TestCase):
+    def test_assign_error_msg(self):
+        response = AbstractResponse()
+        response.error_msg = "bad"
+        self.assertTrue(response.has_error())
+        self.assertFalse(response.is_successful_response())
+        self.assertIs(response.status, ResponseStatus.ERROR)
+        response.error_msg = None
+        self.assertTrue(response.is_successful_response())
+
+    def test_assign_cancelled(self):
+        response = AbstractResponse(error_msg="bad")
+        response.cancelled = True
+        self.assertTrue(response.is_cancelled())
+        self.assertIs(response.status, ResponseStatus.CANCELLED)
+        response.cancelled = False
+        self.assertIs(response.status, ResponseStatus.ERROR)
+
+    def test_subclasses(self):
+        self.assertTrue(ErrorResponse("bad").has_error())
+        cancelled = CancelledResponse()
+        self.assertTrue(cancelled.has_error() and cancelled.is_cancelled())
+        cancelled.errorify("other")
+        self.assertTrue(cancelled.is_cancelled())
+        self.assertEqual(cancelled.get_error_msg(), "other")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import logging
+import unittest
+
+from BottleneckedHTTPAPI.thread_executor import (AbstractRequest, AbstractResponse, AbstractSingleThreadExecutor,
+                                                 PoolFullException, SingleThreadExecutorRouterWrapper)
+
+class _Request(AbstractRequest):
+    __slots__ = ("x",)
+
+    def __init__(self, x: int):
+        super().__init__()
+        self.x = x
+
+class _Response(AbstractResponse):
+    __slots__ = ("x", "post")
+
+class _Executor(AbstractSingleThreadExecutor):
+    """Answers every request with its x. The iterations are run by the tests, without starting the thread."""
+    def __init__(self, **kwargs):
+        super().__init__(logging.getLogger("test_router"), **kwargs)
+
+    def initialize(self) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+    def _handle_request_cancel(self, token, request) -> None:
+        pass
+
+    def _handle_all_requests(self, all_requests_queue, all_requests_data) -> None:
+        for token in all_requests_queue:
+            response = _Response()
+            response.x = all_requests_data[token].x
+            self.accept(token, response)
+
+def _pre(x: int):
+    if x < 0:
+        raise ValueError("negative")
+    return _Request(x), x
+
+def _post(response: _Response, static_state: int) -> None:
+    response.post = static_state
+
+class TestRouter(unittest.TestCase):
+    def setUp(self):
+        self.a = _Executor(max_handle_requests_and_responses=3)
+        self.b = _Executor(max_handle_requests_and_responses=3)
+
+    def test_single_value_lookup(self):
+        # values of length 1 are looked up by their only element, from lists and tuples alike
+        router = SingleThreadExecutorRouterWrapper(self.a)
+        router.register_processor_pair(("x",), _pre, _post)
+        router.register_processor_pair((2,), _pre, _post)
+        self.assertTrue(router.has_value(["x"]))
+        self.assertTrue(router.has_value(("x",)))
+        self.assertTrue(router.has_value([2.0])) # equal numbers hash the same, as with tuples
+        self.assertFalse(router.has_value(["y"]))
+        self.assertFalse(router.has_value(["x", "x"]))
+        self.assertFalse(router.has_value([["x"]])) # unhashable
+        self.assertFalse(router.has_value("x")) # not a list or tuple
+        token = router.queue_request(["x"], x=2)
+        self.a._process_iteration()
+        response = router.poll_response(token)
+        self.assertEqual((response.x, response.post), (2, 2))
+
+    def test_prefix_split(self):
+        router = SingleThreadExecutorRouterWrapper({"a": self.a, "b": self.b})
+        router.register_processor_pair(("a", 1), _pre, _post, "a")
+        router.register_processor_pair(("b", 1), _pre, _post, "b")
+        token_a = router.queue_request(("a", 1), x=1)
+        token_b = router.queue_request(["b", 1], x=2)
+        self.assertEqual((token_a[:4], token_b[:4]), ("0000", "0001")) # fixed width prefix of the executor
+        self.assertEqual(len(token_a), 4 + 32)
+        self.a._process_iteration()
+        self.b._process_iteration()
+        self.assertEqual(router.poll_response(token_b).x, 2)
+        self.assertEqual(router.poll_response(token_a).x, 1)
+
+        # tokens with an unknown or truncated prefix are rejected without reaching an executor
+        for token in ("", "00", "ffff" + token_a[4:], "0002" + token_a[4:]):
+            self.assertEqual(router.poll_response(token).get_error_msg(), "Invalid token format.")
+            router.cancel_request(token)
+        # a known prefix with an unknown token reaches the executor, which rejects it
+        response = router.poll_response("0000" + "0" * 32)
+        self.assertTrue(response.has_error())
+        self.assertNotEqual(response.get_error_msg(), "Invalid token format.")
+
+        # the batch rollback resolves the executor of each token from its prefix
+        with self.assertRaises(ValueError):
+            router.queue_requests([(("a", 1), {"x": 1}), (("b", 1), {"x": 2}), (("b", 1), {"x": -1})])
+        self.assertEqual(len(router.queue_requests([(("a", 1), {"x": i}) for i in range(3)] + [(("b", 1), {"x": i}) for i in range(3)])), 6)
+
+    def test_value_validation(self):
+        router = SingleThreadExecutorRouterWrapper(self.a)
+        router.register_processor_pair(("x", 1), _pre, _post)
+        for bad in ([], ("x",), ("x", 1, 2)): # the registered values have length 2
+            with self.assertRaises(ValueError):
+                router.queue_request(bad, x=1)
+        with self.assertRaises(ValueError):
+            router.queue_request(["x", None], x=1)
+        with self.assertRaises(NotImplementedError): # valid, but not registered
+            router.queue_request(["x", 2], x=1)
+        with self.assertRaises(ValueError):
+            router.queue_request("x1", x=1)
+        for bad in (["x", 2], ("x",), ("x", None), ("x", 1)): # not a tuple, wrong length, wrong type, repeated
+            with self.assertRaises(ValueError):
+                router.register_processor_pair(bad, _pre, _post)
+        self.assertEqual(len(router.queue_request(["x", 1], x=1)), 32)
+
+    def test_suppress_exc(self):
+        # queue_request and queue_request_suppress_exc share the same path, and report the same errors
+        router = SingleThreadExecutorRouterWrapper(self.a)
+        router.register_processor_pair(("x",), _pre, _post)
+        self.assertEqual(router.queue_request_suppress_exc(["y"], x=1), ("Not Implemented Yet.", False))
+        self.assertEqual(router.queue_request_suppress_exc(["x"], x=-1), ("Internal error when preprocessing the request.", False))
+        with self.assertRaises(ValueError): # the preprocess error is raised as is
+            router.queue_request(["x"], x=-1)
+        with self.assertRaises(ValueError): # invalid values raise in both variants
+            router.queue_request_suppress_exc(["x", 1], x=1)
+
+        tokens = [router.queue_request_suppress_exc(["x"], x=i) for i in range(3)]
+        self.assertTrue(all(ok for _, ok in tokens))
+        self.assertEqual(router.queue_request_suppress_exc(["x"], x=3), ("The execution pool is full. Please wait.", False))
+        with self.assertRaises(PoolFullException):
+            router.queue_request(["x"], x=3)
+        self.a._process_iteration()
+        self.assertEqual([router.poll_response(token).post for token, _ in tokens], [0, 1, 2])
+
+    def test_batch_rollback_frees_the_pool(self):
+        router = SingleThreadExecutorRouterWrapper(self.a)
+        router.register_processor_pair(("x",), _pre, _post)
+        with self.assertRaises(PoolFullException): # the 4th request doesn't fit
+            router.queue_requests([(["x"], {"x": i}) for i in range(4)])
+        with self.assertRaises(ValueError): # the preprocessing of the 2nd request fails
+            router.queue_requests([(["x"], {"x": 1}), (["x"], {"x": -1})])
+
+        # the rolled back requests no longer hold the pool, and their responses are dropped
+        tokens = router.queue_requests([(["x"], {"x": i}) for i in range(3)])
+        self.a._process_iteration()
+        self.assertEqual([router.poll_response(token).x for token in tokens], [0, 1, 2])
+        self.a._process_iteration()
+        self.assertEqual(len(router.queue_requests([(["x"], {"x": i}) for i in range(3)])), 3)
+
+    def test_discard_after_response(self):
+        router = SingleThreadExecutorRouterWrapper(self.a)
+        router.register_processor_pair(("x",), _pre, _post)
+        tokens = router.queue_requests([(["x"], {"x": i}) for i in range(3)])
+        self.a._process_iteration() # the responses are published, then discarded
+        for token in tokens:
+            self.a.discard_request(token)
+        self.assertTrue(router.poll_response(tokens[0]).has_error()) # no longer a valid token
+        self.assertEqual(len(router.queue_requests([(["x"], {"x": i}) for i in range(3)])), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from unittest import mock
+
+from BottleneckedHTTPAPI.http_server import routing
+
+def _compile(*patterns: str) -> routing.PatternRoutes:
+    routes = routing.PatternRoutes()
+    for p in patterns:
+        routes.add(routing.encode_pattern(p), p)
+    routes.compile()
+    return routes
+
+@mock.patch.object(routing, "hyperscan", None) # the regular expression fallback
+class TestPatternRoutes(unittest.TestCase):
+    def test_backreference(self):
+        routes = _compile(r"/x/(a+)-\1", r"/y/\d+")
+        self.assertEqual(routes.match(b"/x/aa-aa"), r"/x/(a+)-\1")
+        self.assertIsNone(routes.match(b"/x/aa-a"))
+        self.assertEqual(routes.match(b"/y/12"), r"/y/\d+")
+
+    def test_named_groups(self):
+        # r0 is also the name of the internal groups, and the same name is used by two patterns
+        routes = _compile(r"/a/(?P<r0>\d+)", r"/b/(?P<r0>\w+)/(?P=r0)", r"/c/.*")
+        self.assertEqual(routes.match(b"/a/1"), r"/a/(?P<r0>\d+)")
+        self.assertEqual(routes.match(b"/b/x/x"), r"/b/(?P<r0>\w+)/(?P=r0)")
+        self.assertIsNone(routes.match(b"/b/x/y"))
+        self.assertEqual(routes.match(b"/c/d"), r"/c/.*")
+
+    def test_first_added_wins(self):
+        routes = _compile(r"/u/.*", r"/u/(\d+)", r"/v/(\d+)", r"/v/.*")
+        self.assertEqual(routes.match(b"/u/1"), r"/u/.*")
+        self.assertEqual(routes.match(b"/v/1"), r"/v/(\d+)")
+        self.assertEqual(routes.match(b"/v/a"), r"/v/.*")
+        self.assertIsNone(routes.match(b"/w"))
+
+    def test_invalid_pattern(self):
+        with self.assertRaises(ValueError):
+            routing.encode_pattern("(")
+
+if __name__ == "__main__":
+    unittest.main()
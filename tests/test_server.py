@@ -0,0 +1,61 @@
+import logging
+import os
+import ssl
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from BottleneckedHTTPAPI.http_server import server
+
+class TestCheckReadable(unittest.TestCase):
+    def test_check_readable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cert.pem")
+            with open(path, "wb") as f:
+                f.write(b"x")
+            server._check_readable(path, "Certificate file")
+            for bad in (os.path.join(directory, "missing.pem"), directory):
+                with self.assertRaises(FileNotFoundError):
+                    server._check_readable(bad, "Certificate file")
+
+class TestHostContexts(unittest.TestCase):
+    def setUp(self):
+        self.hosts = server._HostContexts(logging.getLogger("test_server"), num_tickets=2)
+        self.hosts.add("Example.com", "cert.pem", "key.pem", None)
+        self.sslsock = types.SimpleNamespace(context="default")
+
+    @mock.patch.object(server, "create_server_ssl_context")
+    def test_loaded_once(self, create):
+        create.side_effect = lambda *params: ("context", params)
+        for name in ("example.com", "EXAMPLE.com"): # hostnames are case insensitive
+            self.assertIsNone(self.hosts.sni_callback(self.sslsock, name, None))
+            self.assertEqual(self.sslsock.context, ("context", ("cert.pem", "key.pem", None, 2)))
+        create.assert_called_once()
+
+        # adding the host again replaces the cached context
+        self.hosts.add("example.com", "cert2.pem", "key2.pem", None)
+        self.hosts.sni_callback(self.sslsock, "example.com", None)
+        self.assertEqual(self.sslsock.context, ("context", ("cert2.pem", "key2.pem", None, 2)))
+
+    @mock.patch.object(server, "create_server_ssl_context")
+    def test_default_context(self, create):
+        for name in (None, "other.com"): # no SNI, or a host without its own certificate
+            self.assertIsNone(self.hosts.sni_callback(self.sslsock, name, None))
+            self.assertEqual(self.sslsock.context, "default")
+        create.assert_not_called()
+
+    @mock.patch.object(server, "create_server_ssl_context", side_effect=FileNotFoundError("missing"))
+    def test_load_error(self, create):
+        with self.assertLogs("test_server", logging.ERROR):
+            self.assertEqual(self.hosts.sni_callback(self.sslsock, "example.com", None), ssl.ALERT_DESCRIPTION_INTERNAL_ERROR)
+        self.assertEqual(self.sslsock.context, "default")
+
+    def test_requires_tls(self):
+        http_server = server.ThreadedHTTPServer("127.0.0.1", 0, logging.getLogger("test_server"))
+        http_server.set_security_parameters() # without TLS
+        with self.assertRaises(RuntimeError):
+            http_server.add_host_certificate("example.com", "cert.pem", "key.pem")
+
+if __name__ == "__main__":
+    unittest.main()
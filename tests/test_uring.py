@@ -0,0 +1,102 @@
+import logging
+import socket
+import threading
+import unittest
+
+from BottleneckedHTTPAPI.http_server import uring, ThreadedHTTPServer, send_http_response
+
+def _listen() -> socket.socket:
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.bind(("127.0.0.1", 0))
+    server_socket.listen(16)
+    return server_socket # blocking, as in ThreadedHTTPServer
+
+@unittest.skipUnless(uring.is_available(), "liburing is not installed")
+class TestUringAcceptor(unittest.TestCase):
+    def setUp(self):
+        self.server_socket = _listen()
+        self.wakeup_r, self.wakeup_w = socket.socketpair()
+        self.acceptor = uring.UringAcceptor(self.server_socket, self.wakeup_r.fileno(), depth=4)
+        self.clients: list[socket.socket] = []
+
+    def tearDown(self):
+        if self.acceptor is not None:
+            self.acceptor.close()
+        for s in self.clients + [self.server_socket, self.wakeup_r, self.wakeup_w]:
+            s.close()
+
+    def __connect(self) -> socket.socket:
+        client = socket.create_connection(self.server_socket.getsockname())
+        client.settimeout(5.0)
+        self.clients.append(client)
+        return client
+
+    def test_accept_and_wakeup(self):
+        clients = {self.__connect().getsockname() for _ in range(5)} # more than the accepts in flight
+        accepted = set()
+        while len(accepted) < len(clients):
+            for client_socket, addr in self.acceptor.wait():
+                self.assertEqual(client_socket.getpeername(), addr)
+                accepted.add(addr)
+                client_socket.close()
+        self.assertEqual(accepted, clients)
+
+        self.wakeup_w.send(b"x")
+        self.assertEqual(list(self.acceptor.wait()), [])
+
+    def test_close_drops_connections_not_handed_out(self):
+        first, second = self.__connect(), self.__connect()
+        handed = []
+        while not handed:
+            for client_socket, addr in self.acceptor.wait():
+                handed.append(client_socket)
+                break # abandon the rest of the batch
+        handed[0].close()
+        self.acceptor.close()
+        self.acceptor = None
+        self.server_socket.close()
+
+        # the connection that wasn't handed out is closed by close(), or reset with the listen socket if it wasn't accepted yet.
+        # a leaked fd would keep it open, and the recv would time out
+        for client in (first, second):
+            try:
+                self.assertEqual(client.recv(1), b"")
+            except ConnectionResetError:
+                pass
+
+@unittest.skipUnless(uring.is_available(), "liburing is not installed")
+class TestUringBackend(unittest.TestCase):
+    def test_serve(self):
+        server = ThreadedHTTPServer("127.0.0.1", 0, logging.getLogger("test_uring"), backend="io_uring")
+        server.set_security_parameters()
+        @server.route("/hello")
+        def hello(request, client_socket):
+            send_http_response(client_socket, 200, {}, b"Hello")
+
+        # port 0 can't be known in advance, so bind a free port first
+        probe = _listen()
+        server.port = probe.getsockname()[1]
+        probe.close()
+        thread = threading.Thread(target=server.run, kwargs={"allow_reuse": True})
+        thread.start()
+        try:
+            for _ in range(50): # wait until listening
+                try:
+                    client = socket.create_connection(("127.0.0.1", server.port), timeout=5.0)
+                    break
+                except ConnectionRefusedError:
+                    threading.Event().wait(0.05)
+            with client:
+                client.sendall(b"GET /hello HTTP/1.1\r\n\r\n")
+                response = b""
+                while chunk := client.recv(4096):
+                    response += chunk
+            self.assertTrue(response.startswith(b"HTTP/1.1 200"))
+            self.assertTrue(response.endswith(b"Hello"))
+        finally:
+            server.stop()
+            thread.join(10.0)
+        self.assertFalse(thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()